@@ -0,0 +1,192 @@
+"""JWT-аутентификация с кэшированием пользователей.
+
+Пользователь из токена ищется в LRU текущего процесса с коротким TTL, а
+при заданном `USER_CACHE_ALIAS` — ещё и в общем кэше Django, поэтому
+запрос с токеном обычно не читает таблицу пользователей. Изменения
+пользователя через модель сбрасывают запись (см. `api.signals`); в других
+процессах устаревшая запись живёт не дольше `USER_CACHE_TTL`.
+
+Токены, выданные `get_token`, дополнительно несут роль и версию токенов
+пользователя. Для них `request.user` собирается прямо из токена
+без обращения к таблице пользователей: проверяется только текущая версия
+токенов из кэша `TOKEN_VERSION_CACHE_ALIAS`. Изменение роли или
+активности пользователя увеличивает версию и отзывает выданные токены.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router, transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+USER_KEY = 'auth-users:{pk}'
+TOKEN_VERSION_KEY = 'token-versions:{pk}'
+TOKEN_VERSION_CLAIM = 'token_version'
+USER_CLAIMS = ('role', 'is_superuser', TOKEN_VERSION_CLAIM)
+
+
+class UserCache:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get_shared_cache(self):
+        alias = settings.USER_CACHE_ALIAS
+        return caches[alias] if alias else None
+
+    def remember(self, pk, user):
+        with self.lock:
+            expires_at = time.monotonic() + settings.USER_CACHE_TTL
+            self.entries[pk] = (user, expires_at)
+            self.entries.move_to_end(pk)
+            while len(self.entries) > settings.USER_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def get(self, pk):
+        with self.lock:
+            user, expires_at = self.entries.get(pk, (None, 0))
+            if user is not None and expires_at > time.monotonic():
+                self.entries.move_to_end(pk)
+                return user
+            self.entries.pop(pk, None)
+        shared = self.get_shared_cache()
+        if shared is None:
+            return None
+        user = shared.get(USER_KEY.format(pk=pk))
+        if user is not None:
+            self.remember(pk, user)
+        return user
+
+    def set(self, pk, user):
+        self.remember(pk, user)
+        shared = self.get_shared_cache()
+        if shared is not None:
+            shared.set(USER_KEY.format(pk=pk), user, settings.USER_CACHE_TTL)
+
+    def delete(self, pk):
+        with self.lock:
+            self.entries.pop(pk, None)
+        shared = self.get_shared_cache()
+        if shared is not None:
+            shared.delete(USER_KEY.format(pk=pk))
+
+    def invalidate(self, pk):
+        """Удаляет запись сразу и ещё раз после фиксации транзакции.
+
+        Повторное удаление не даёт параллельному запросу закэшировать
+        строку, прочитанную до фиксации изменений.
+        """
+        self.delete(pk)
+        transaction.on_commit(lambda: self.delete(pk))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache()
+
+
+def load_user(pk):
+    """Полный пользователь через кэш пользователей."""
+    user = user_cache.get(pk)
+    if user is None:
+        user = User.objects.get(pk=pk)
+        user_cache.set(pk, user)
+    return copy.copy(user)
+
+
+def get_token(user):
+    """Refresh-токен с данными пользователя для проверки прав.
+
+    Токен доступа, полученный из него, копирует эти данные.
+    """
+    token = RefreshToken.for_user(user)
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def get_token_versions():
+    return caches[settings.TOKEN_VERSION_CACHE_ALIAS]
+
+
+def get_token_version(pk):
+    """Текущая версия токенов активного пользователя или None."""
+    key = TOKEN_VERSION_KEY.format(pk=pk)
+    version = get_token_versions().get(key)
+    if version is None:
+        version = User.objects.filter(pk=pk, is_active=True).values_list(
+            'token_version', flat=True).first()
+        if version is not None:
+            get_token_versions().set(
+                key, version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def invalidate_token_version(pk):
+    key = TOKEN_VERSION_KEY.format(pk=pk)
+    get_token_versions().delete(key)
+    transaction.on_commit(lambda: get_token_versions().delete(key))
+
+
+def make_token_user(validated_token):
+    """Пользователь, собранный из данных токена.
+
+    Это экземпляр `User`, в котором загружены только поля из токена,
+    поэтому проверки прав и сравнение с авторами объектов работают без
+    запросов. Остальные поля отложены и читаются из базы при обращении.
+    """
+    values = {
+        field: validated_token[claim] for field, claim in (
+            (api_settings.USER_ID_FIELD, api_settings.USER_ID_CLAIM),
+            *((claim, claim) for claim in USER_CLAIMS),
+        )
+    }
+    values['is_active'] = True
+    field_names = [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in values
+    ]
+    return User.from_db(
+        router.db_for_read(User),
+        field_names,
+        [values[name] for name in field_names],
+    )
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        if TOKEN_VERSION_CLAIM in validated_token:
+            return self.get_token_user(validated_token)
+        pk = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = None if pk is None else user_cache.get(pk)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(pk, user)
+        # Запрос получает копию, чтобы изменения request.user не попадали
+        # в общий кэш.
+        return copy.copy(user)
+
+    def get_token_user(self, validated_token):
+        version = get_token_version(
+            validated_token.get(api_settings.USER_ID_CLAIM))
+        if version is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден или неактивен.',
+                code='user_not_found')
+        if version != validated_token[TOKEN_VERSION_CLAIM]:
+            raise AuthenticationFailed(
+                'Токен отозван.', code='token_revoked')
+        return make_token_user(validated_token)
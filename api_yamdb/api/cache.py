@@ -0,0 +1,130 @@
+"""Версии данных для условных GET-запросов и кэша ответов.
+
+Каждая группа данных (список произведений, отзывы произведения и т.д.)
+имеет версию в кэше Django, которая заменяется при записи. ETag и ключ
+кэша ответа строятся из версий, поэтому проверяются без обращения к базе
+и рендеринга. Старые записи кэша не удаляются явно, а просто перестают
+читаться и вытесняются по таймауту, поэтому подходит любой бэкенд.
+Версии тоже живут не дольше `TITLES_CACHE_TIMEOUT`: если кэш не общий
+для всех процессов, замена версии в одном процессе доходит до остальных
+не позже этого срока.
+"""
+from hashlib import md5
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from rest_framework import response, status
+
+TITLES_VERSION = 'versions:titles'
+TITLES_DETAIL_VERSION = 'versions:titles-detail'
+TITLE_VERSION = 'versions:title:{pk}'
+CATEGORIES_VERSION = 'versions:categories'
+GENRES_VERSION = 'versions:genres'
+TITLE_REVIEWS_VERSION = 'versions:title-reviews:{title_id}'
+REVIEW_COMMENTS_VERSION = 'versions:review-comments:{review_id}'
+USERS_VERSION = 'versions:users'
+
+
+def get_cache():
+    return caches[settings.TITLES_CACHE_ALIAS]
+
+
+def get_versions(*keys):
+    cache = get_cache()
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid4().hex, settings.TITLES_CACHE_TIMEOUT)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*keys):
+    get_cache().set_many({key: uuid4().hex for key in keys},
+                         settings.TITLES_CACHE_TIMEOUT)
+
+
+def invalidate(*keys):
+    """Заменяет версии после фиксации текущей транзакции."""
+    transaction.on_commit(lambda: bump_versions(*keys))
+
+
+def normalize_query(request):
+    params = request.query_params
+    return urlencode(sorted(
+        (key, value)
+        for key in params
+        for value in params.getlist(key)
+    ))
+
+
+def build_key(request, *versions):
+    raw = '|'.join((
+        request.build_absolute_uri(request.path),
+        normalize_query(request),
+        request.accepted_renderer.format,
+        *versions,
+    ))
+    return md5(raw.encode()).hexdigest()
+
+
+class VersionedResponseMixin:
+    """ETag для ответов, вычисляемый по версиям данных.
+
+    Если ETag совпадает с `If-None-Match`, возвращается 304 без запросов
+    к базе. При `cache_responses = True` данные ответа также кэшируются
+    до ближайшей смены версий.
+    """
+
+    version_keys = ()
+    detail_version_keys = None
+    cache_responses = False
+
+    def get_version_keys(self):
+        keys = self.version_keys
+        if self.detail and self.detail_version_keys is not None:
+            keys = self.detail_version_keys
+        return [key.format(**self.kwargs) for key in keys]
+
+    def versioned_response(self, view, request, *args, **kwargs):
+        key = build_key(request, *get_versions(*self.get_version_keys()))
+        etag = f'"{key}"'
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            return not_modified
+        data = get_cache().get(key) if self.cache_responses else None
+        if data is not None:
+            result = response.Response(data)
+        else:
+            result = view(request, *args, **kwargs)
+            if result.status_code != status.HTTP_200_OK:
+                return result
+            if self.cache_responses:
+                get_cache().set(key, result.data,
+                                settings.TITLES_CACHE_TIMEOUT)
+        result['ETag'] = etag
+        return result
+
+
+class ConditionalListMixin(VersionedResponseMixin):
+
+    def list(self, request, *args, **kwargs):
+        return self.versioned_response(super().list, request,
+                                       *args, **kwargs)
+
+
+class ConditionalRetrieveMixin(VersionedResponseMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.versioned_response(super().retrieve, request,
+                                       *args, **kwargs)
+
+
+class ConditionalResponseMixin(ConditionalListMixin,
+                               ConditionalRetrieveMixin):
+    pass
@@ -19,3 +19,14 @@ MIN_RATING = 1
 MAX_RATING = 10
 
 LIMIT_STRING = 15
+
+BULK_BATCH_SIZE = 500
+
+LEADERBOARD_LIMIT = 10
+LEADERBOARD_MAX_LIMIT = 100
+LEADERBOARD_MIN_REVIEWS = 1
+
+COMMENTS_PREVIEW_LIMIT = 3
+COMMENTS_PREVIEW_MAX_LIMIT = 20
+
+EXPORT_CHUNK_SIZE = 2000
@@ -0,0 +1,47 @@
+"""Потоковая выгрузка отзывов и комментариев в формате NDJSON.
+
+Записи читаются `QuerySet.iterator()` порциями и сразу превращаются в
+строки, поэтому расход памяти не зависит от объёма выгрузки.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+
+from api.constants import EXPORT_CHUNK_SIZE
+from reviews.models import Comment, Review
+
+REVIEW_FIELDS = ('id', 'title_id', 'text', 'score', 'pub_date',
+                 'comments_count')
+COMMENT_FIELDS = ('id', 'review_id', 'text', 'pub_date')
+
+
+def export_rows(queryset, record_type, fields, chunk_size, **expressions):
+    rows = queryset.values(
+        *fields, username=F('author__username'), **expressions)
+    for row in rows.iterator(chunk_size=chunk_size):
+        row['author'] = row.pop('username')
+        yield json.dumps(
+            {'type': record_type, **row},
+            cls=DjangoJSONEncoder,
+            ensure_ascii=False,
+        ) + '\n'
+
+
+def export_lines(since=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Строки NDJSON: сначала отзывы, затем комментарии.
+
+    С `since` выгружаются только записи, опубликованные позже этого
+    момента, в порядке публикации: так выборку и сортировку обслуживает
+    индекс по `pub_date`. Иначе записи выгружаются в порядке id.
+    """
+    reviews = Review.objects.order_by('pk')
+    comments = Comment.objects.order_by('pk')
+    if since is not None:
+        reviews = reviews.filter(pub_date__gt=since).order_by(
+            'pub_date', 'pk')
+        comments = comments.filter(pub_date__gt=since).order_by(
+            'pub_date', 'pk')
+    yield from export_rows(reviews, 'review', REVIEW_FIELDS, chunk_size)
+    yield from export_rows(comments, 'comment', COMMENT_FIELDS, chunk_size,
+                           title_id=F('review__title_id'))
@@ -1,5 +1,7 @@
 from django_filters import rest_framework
+from rest_framework import filters
 
+from reviews.fts import search_titles
 from reviews.models import Title
 
 
@@ -12,3 +14,18 @@ class TitleFilter(rest_framework.FilterSet):
     class Meta:
         model = Title
         fields = ['name', 'year', 'genre', 'category']
+
+
+class TitleSearchFilter(filters.SearchFilter):
+    """Поиск по полнотекстовому индексу с сортировкой по релевантности.
+
+    На базах без FTS5 работает как обычный `SearchFilter`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if search_terms:
+            found = search_titles(queryset, search_terms)
+            if found is not None:
+                return found
+        return super().filter_queryset(request, queryset, view)
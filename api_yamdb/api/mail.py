@@ -0,0 +1,102 @@
+"""Фоновая отправка писем.
+
+Письма складываются в ограниченную очередь и отправляются рабочими
+потоками с повторными попытками, поэтому запрос не ждёт SMTP-сервер.
+Потоки фоновые: письма, оставшиеся в очереди при остановке процесса,
+теряются, и пользователь может запросить код повторно.
+"""
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import send_mail
+
+logger = logging.getLogger(__name__)
+
+
+class MailDispatcher:
+
+    def __init__(self):
+        self.queue = None
+        self.lock = threading.Lock()
+        self.counters = dict.fromkeys(
+            ('queued', 'sent', 'retried', 'failed', 'rejected'), 0)
+
+    def start(self):
+        """Создаёт очередь и запускает рабочие потоки при первом письме."""
+        with self.lock:
+            if self.queue is not None:
+                return
+            self.queue = queue.Queue(maxsize=settings.MAIL_QUEUE_SIZE)
+            for _ in range(settings.MAIL_WORKERS):
+                threading.Thread(
+                    target=self.run, name='mail-dispatcher', daemon=True
+                ).start()
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def metrics(self):
+        """Счётчики отправки и текущая длина очереди."""
+        with self.lock:
+            return {
+                **self.counters,
+                'queue_size': self.queue.qsize() if self.queue else 0,
+            }
+
+    def submit(self, **message):
+        """Ставит письмо в очередь.
+
+        Принимает аргументы `send_mail`. Возвращает False, если очередь
+        заполнена и письмо не принято.
+        """
+        if settings.MAIL_DISPATCH_EAGER:
+            return self.deliver(message)
+        self.start()
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            self.count('rejected')
+            logger.warning('Очередь писем заполнена, письмо для %s не '
+                           'принято', message['recipient_list'])
+            return False
+        self.count('queued')
+        return True
+
+    def deliver(self, message):
+        for attempt in range(settings.MAIL_RETRIES + 1):
+            if attempt:
+                self.count('retried')
+                time.sleep(settings.MAIL_RETRY_DELAY * attempt)
+            try:
+                send_mail(fail_silently=False, **message)
+            except Exception:
+                logger.warning('Ошибка отправки письма для %s, попытка %d',
+                               message['recipient_list'], attempt + 1,
+                               exc_info=True)
+            else:
+                self.count('sent')
+                return True
+        self.count('failed')
+        logger.error('Письмо для %s не отправлено',
+                     message['recipient_list'])
+        return False
+
+    def run(self):
+        while True:
+            message = self.queue.get()
+            try:
+                self.deliver(message)
+            finally:
+                self.queue.task_done()
+
+    def join(self):
+        """Ждёт отправки всех писем, принятых в очередь."""
+        if self.queue is not None:
+            self.queue.join()
+
+
+dispatcher = MailDispatcher()
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from api.export import export_lines
+
+
+class Command(BaseCommand):
+    help = 'Выгрузка отзывов и комментариев в формате NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Выгрузить только записи, опубликованные после этого '
+                 'момента (ISO 8601)'
+        )
+        parser.add_argument(
+            '--output',
+            help='Путь к файлу; по умолчанию вывод в stdout'
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(
+                    f'Некорректная дата --since: {options["since"]}')
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.writelines(export_lines(since=since))
+        else:
+            for line in export_lines(since=since):
+                self.stdout.write(line, ending='')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.cache import TITLE_REVIEWS_VERSION, invalidate
+from reviews.models import Review
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт количества комментариев к отзывам'
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        reviews = Review.objects.all()
+        updated = reviews.recompute_comments_counts()
+        invalidate(*(
+            TITLE_REVIEWS_VERSION.format(title_id=title_id)
+            for title_id in reviews.values_list(
+                'title_id', flat=True).order_by().distinct()
+        ))
+        self.stdout.write(self.style.SUCCESS(
+            f'Количество комментариев пересчитано для {updated} отзывов.'
+        ))
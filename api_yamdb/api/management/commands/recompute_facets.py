@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.cache import TITLES_DETAIL_VERSION, TITLES_VERSION, invalidate
+from reviews.counters import recompute_counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт количества произведений по жанрам, категориям и годам'
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        recompute_counters()
+        invalidate(TITLES_VERSION, TITLES_DETAIL_VERSION)
+        self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны.'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.cache import TITLES_DETAIL_VERSION, TITLES_VERSION, invalidate
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт сохранённых рейтингов произведений по отзывам'
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        updated = Title.objects.all().recompute_ratings()
+        invalidate(TITLES_VERSION, TITLES_DETAIL_VERSION)
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинги пересчитаны для {updated} произведений.'
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.cache import TITLES_DETAIL_VERSION, invalidate
+from reviews.counters import recompute_score_counts
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт распределения оценок произведений по отзывам'
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        recompute_score_counts()
+        invalidate(TITLES_DETAIL_VERSION)
+        self.stdout.write(self.style.SUCCESS(
+            'Распределение оценок пересчитано.'))
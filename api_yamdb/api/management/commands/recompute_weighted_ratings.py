@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.cache import TITLES_DETAIL_VERSION, TITLES_VERSION, invalidate
+from reviews.ratings import recompute_weighted_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт взвешенного рейтинга произведений по всем отзывам'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-votes',
+            type=int,
+            default=settings.WEIGHTED_RATING_MIN_VOTES,
+            help='Вес общей средней оценки (минимальное число голосов)'
+        )
+
+    def handle(self, *args, **options):
+        updated = recompute_weighted_ratings(options['min_votes'])
+        invalidate(TITLES_VERSION, TITLES_DETAIL_VERSION)
+        self.stdout.write(self.style.SUCCESS(
+            f'Взвешенный рейтинг пересчитан для {updated} произведений.'
+        ))
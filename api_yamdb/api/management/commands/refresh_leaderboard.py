@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import TITLES_DETAIL_VERSION, TITLES_VERSION, invalidate
+from reviews.leaderboard import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Пересборка рейтинга лучших произведений'
+
+    def handle(self, *args, **options):
+        rebuild()
+        invalidate(TITLES_VERSION, TITLES_DETAIL_VERSION)
+        self.stdout.write(self.style.SUCCESS('Рейтинг пересобран.'))
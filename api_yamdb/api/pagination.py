@@ -0,0 +1,55 @@
+from rest_framework import pagination
+
+
+class TitleCursorPagination(pagination.CursorPagination):
+    ordering = ('name', 'id')
+
+
+class PubDateCursorPagination(pagination.CursorPagination):
+    ordering = ('pub_date', 'id')
+
+
+class AuthorFeedPagination(pagination.CursorPagination):
+    """Курсорная пагинация ленты пользователя, новые записи первыми."""
+
+    ordering = ('-pub_date', '-id')
+
+
+class OptionalCursorPagination(pagination.BasePagination):
+    """Обычная пагинация с переходом на курсорную по параметру `cursor`.
+
+    Курсорный режим не выполняет COUNT(*) и OFFSET: первая страница
+    запрашивается с пустым `?cursor=`, следующие — по ссылкам
+    `next`/`previous` из ответа.
+    """
+
+    default_class = pagination.PageNumberPagination
+    cursor_class = None
+
+    def __init__(self):
+        self.paginator = self.default_class()
+
+    def __getattr__(self, name):
+        if name == 'paginator':
+            raise AttributeError(name)
+        return getattr(self.paginator, name)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_class.cursor_query_param in request.query_params:
+            self.paginator = self.cursor_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+
+class TitlePagination(OptionalCursorPagination):
+    cursor_class = TitleCursorPagination
+
+
+class ReviewCommentPagination(OptionalCursorPagination):
+    default_class = pagination.LimitOffsetPagination
+    cursor_class = PubDateCursorPagination
@@ -1,11 +1,22 @@
+from collections import Counter
+
 from django.contrib.auth import get_user_model
 from django.core.validators import RegexValidator
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.encoding import smart_str
 from rest_framework import serializers
 from rest_framework.exceptions import NotFound
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework.settings import api_settings
 
 from api import constants
+from api.authentication import get_token
+from reviews.counters import (change_category_counts, change_genre_counts,
+                              change_year_counts, moved)
+from reviews.leaderboard import schedule_refresh
 from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import genre_counters_skipped
+from users.codes import get_code_store
 
 User = get_user_model()
 
@@ -29,39 +40,49 @@ class SignUpSerializer(serializers.Serializer):
     )
 
     def validate(self, data):
+        """Проверяет username и email одним запросом.
+
+        Если пользователь с такими username и email уже есть, он
+        сохраняется в `self.user` и используется в `create`.
+        """
         username = data.get('username')
         email = data.get('email')
         if username in constants.BANNED_USERNAMES:
             raise serializers.ValidationError(
                 f'Использовать имя "{username}" в качестве username запрещено.'
             )
-        if email:
-            try:
-                user = User.objects.get(email=email)
-                if user.username != username:
-                    raise serializers.ValidationError(
-                        'Пользователь с таким email уже существует.'
-                    )
-            except User.DoesNotExist:
-                pass
-        if username:
-            try:
-                user = User.objects.get(username=username)
-                if user.email != email:
-                    raise serializers.ValidationError(
-                        f'Пользователь "{username}" уже существует.'
-                    )
-            except User.DoesNotExist:
-                pass
-
+        users = User.objects.filter(Q(email=email) | Q(username=username))
+        self.user = None
+        for user in sorted(users, key=lambda user: user.email != email):
+            if user.email == email and user.username != username:
+                raise serializers.ValidationError(
+                    'Пользователь с таким email уже существует.'
+                )
+            if user.username == username and user.email != email:
+                raise serializers.ValidationError(
+                    f'Пользователь "{username}" уже существует.'
+                )
+            self.user = user
         return data
 
     def create(self, validated_data):
-        user, _ = User.objects.get_or_create(
-            email=validated_data['email'],
-            username=validated_data['username']
-        )
-        return user
+        if self.user is not None:
+            return self.user
+        try:
+            with transaction.atomic():
+                return User.objects.create(
+                    email=validated_data['email'],
+                    username=validated_data['username']
+                )
+        except IntegrityError:
+            # Параллельная регистрация с тем же username.
+            user = User.objects.filter(**validated_data).first()
+            if user is None:
+                raise serializers.ValidationError(
+                    f'Пользователь "{validated_data["username"]}" уже '
+                    'существует.'
+                )
+            return user
 
 
 class TokenSerializer(serializers.Serializer):
@@ -81,7 +102,7 @@ class TokenSerializer(serializers.Serializer):
                 detail={'username':
                         'Пользователь с таким username не найден.'})
 
-        if not user.is_confirmation_code_valid(confirmation_code):
+        if not get_code_store().check(user, confirmation_code):
             raise serializers.ValidationError(
                 'Неверный код подтверждения.'
             )
@@ -89,7 +110,7 @@ class TokenSerializer(serializers.Serializer):
         return attrs
 
     def get_token(self, user):
-        return TokenObtainPairSerializer.get_token(user)
+        return get_token(user)
 
 
 class GenreSerializer(serializers.ModelSerializer):
@@ -113,18 +134,29 @@ class ReviewSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = ['id', 'text', 'author', 'score', 'pub_date']
+        fields = ['id', 'text', 'author', 'score', 'pub_date',
+                  'comments_count']
         model = Review
 
-    def validate(self, attrs):
-        if self.context['request'].method == 'POST':
-            user = self.context['request'].user
-            title_id = self.context['view'].kwargs.get('title_id')
-            if Review.objects.filter(author=user, title_id=title_id).exists():
-                raise serializers.ValidationError(
-                    "Разрешено оставить только один отзыв к произведению"
-                )
-        return attrs
+    def create(self, validated_data):
+        """Создаёт отзыв, полагаясь на ограничение `unique_review`.
+
+        Повтор отзыва определяется по ошибке вставки, а не отдельным
+        запросом перед ней, поэтому проверка не пропускает параллельные
+        запросы.
+        """
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                    author=validated_data['author'],
+                    title=validated_data['title']).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Разрешено оставить только один отзыв к произведению'
+                ]
+            })
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -138,6 +170,37 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
 
 
+class AuthorReviewSerializer(ReviewSerializer):
+    title = serializers.IntegerField(source='title_id', read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ['title']
+
+
+class AuthorCommentSerializer(CommentSerializer):
+    review = serializers.IntegerField(source='review_id', read_only=True)
+    title = serializers.IntegerField(source='title_id', read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ['review', 'title']
+
+
+class ReviewWithCommentsSerializer(ReviewSerializer):
+    comments = CommentSerializer(
+        source='latest_comments', many=True, read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ['comments']
+
+
+class ReviewExpandQuerySerializer(serializers.Serializer):
+    expand = serializers.ChoiceField(choices=['comments'], required=False)
+    comments_limit = serializers.IntegerField(
+        min_value=1,
+        max_value=constants.COMMENTS_PREVIEW_MAX_LIMIT,
+        default=constants.COMMENTS_PREVIEW_LIMIT)
+
+
 class TitleSerializer(serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
         slug_field='slug',
@@ -153,8 +216,8 @@ class TitleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Title
         fields = [
-            'id', 'name', 'year', 'rating', 'genre', 'category',
-            'description']
+            'id', 'name', 'year', 'rating', 'weighted_rating', 'genre',
+            'category', 'description']
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
@@ -163,6 +226,144 @@ class TitleSerializer(serializers.ModelSerializer):
         return data
 
 
+class PrefetchedSlugRelatedField(serializers.SlugRelatedField):
+    """Ищет объекты по slug в заранее загруженном словаре из контекста."""
+
+    def __init__(self, context_key, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            return self.context[self.context_key][data]
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+        except TypeError:
+            self.fail('invalid')
+
+
+class TitleBulkListSerializer(serializers.ListSerializer):
+
+    def validate(self, attrs):
+        ids = [item['id'] for item in attrs if 'id' in item]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError(
+                'Одно произведение нельзя изменять дважды за запрос.'
+            )
+        return attrs
+
+    @transaction.atomic
+    def create(self, validated_data):
+        existing = self.context['titles']
+        titles, new_titles, updated_titles = [], [], []
+        for item in validated_data:
+            genres = list(dict.fromkeys(item.pop('genre')))
+            title_id = item.pop('id', None)
+            if title_id is None:
+                title = Title(**item)
+                new_titles.append(title)
+            else:
+                title = existing[title_id]
+                for field, value in item.items():
+                    setattr(title, field, value)
+                updated_titles.append(title)
+            titles.append((title, genres))
+
+        Title.objects.bulk_create(
+            new_titles, batch_size=constants.BULK_BATCH_SIZE)
+        if new_titles and new_titles[0].pk is None:
+            # Бэкенд не возвращает id вставленных строк. Внутри пишущей
+            # транзакции они выданы подряд и последние в таблице.
+            ids = Title.objects.order_by('-pk').values_list(
+                'pk', flat=True)[:len(new_titles)]
+            for title, pk in zip(new_titles, reversed(ids)):
+                title.pk = pk
+        Title.objects.bulk_update(
+            updated_titles, ['name', 'year', 'description', 'category'],
+            batch_size=constants.BULK_BATCH_SIZE)
+
+        title_genres = Title.genre.through
+        old_genre_ids = []
+        for start in range(0, len(updated_titles),
+                           constants.BULK_BATCH_SIZE):
+            links = title_genres.objects.filter(title__in=updated_titles[
+                start:start + constants.BULK_BATCH_SIZE])
+            old_genre_ids.extend(links.values_list('genre_id', flat=True))
+            with genre_counters_skipped():
+                links.delete()
+        title_genres.objects.bulk_create(
+            [title_genres(title_id=title.pk, genre_id=genre.pk)
+             for title, genres in titles for genre in genres],
+            batch_size=constants.BULK_BATCH_SIZE)
+        self.update_counters(titles, new_titles, updated_titles,
+                             old_genre_ids)
+        return [title for title, _ in titles]
+
+    def update_counters(self, titles, new_titles, updated_titles,
+                        old_genre_ids):
+        """Обновляет счётчики и рейтинг, которые пакетная запись обходит."""
+        categories = Counter(title.category_id for title in new_titles)
+        years = Counter(title.year for title in new_titles)
+        for title in updated_titles:
+            loaded = title._loaded_values
+            categories.update(moved(loaded['category_id'], title.category_id))
+            years.update(moved(loaded['year'], title.year))
+        change_category_counts(categories)
+        change_year_counts(years)
+        genres = Counter(
+            genre.pk for _, title_genres in titles for genre in title_genres
+        )
+        genres.subtract(old_genre_ids)
+        change_genre_counts(genres)
+        if updated_titles:
+            schedule_refresh(*(title.pk for title in updated_titles))
+
+
+class TitleBulkSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+    category = PrefetchedSlugRelatedField(
+        'categories',
+        slug_field='slug',
+        queryset=Category.objects.all()
+    )
+    genre = PrefetchedSlugRelatedField(
+        'genres',
+        slug_field='slug',
+        queryset=Genre.objects.all(),
+        many=True
+    )
+
+    class Meta:
+        model = Title
+        fields = ['id', 'name', 'year', 'genre', 'category', 'description']
+        list_serializer_class = TitleBulkListSerializer
+
+    def validate_id(self, value):
+        if value not in self.context['titles']:
+            raise serializers.ValidationError(
+                f'Произведение с id={value} не найдено.'
+            )
+        return value
+
+
+class LeaderboardQuerySerializer(serializers.Serializer):
+    genre = serializers.SlugField(required=False)
+    category = serializers.SlugField(required=False)
+    year = serializers.IntegerField(required=False)
+    min_reviews = serializers.IntegerField(
+        min_value=1,
+        default=constants.LEADERBOARD_MIN_REVIEWS)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=constants.LEADERBOARD_MAX_LIMIT,
+        default=constants.LEADERBOARD_LIMIT)
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    since = serializers.DateTimeField(required=False)
+
+
 class UserSerializer(serializers.ModelSerializer):
     username = serializers.CharField(
         required=True,
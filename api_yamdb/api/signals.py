@@ -0,0 +1,149 @@
+from threading import local
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.authentication import invalidate_token_version, user_cache
+from api.cache import (CATEGORIES_VERSION, GENRES_VERSION,
+                       REVIEW_COMMENTS_VERSION, TITLE_REVIEWS_VERSION,
+                       TITLE_VERSION, TITLES_DETAIL_VERSION, TITLES_VERSION,
+                       USERS_VERSION, bump_versions, invalidate)
+from reviews.deletion import is_deleting
+from reviews.models import Category, Comment, Genre, Review, Title
+
+User = get_user_model()
+
+_pending = local()
+
+
+@receiver(post_save, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    invalidate(TITLES_VERSION, TITLE_VERSION.format(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Title)
+def invalidate_deleted_title(sender, instance, **kwargs):
+    invalidate(
+        TITLES_VERSION,
+        TITLE_VERSION.format(pk=instance.pk),
+        TITLE_REVIEWS_VERSION.format(title_id=instance.pk),
+    )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate(TITLES_VERSION, TITLE_VERSION.format(pk=instance.pk))
+    elif pk_set is None:
+        invalidate(TITLES_VERSION, TITLES_DETAIL_VERSION)
+    else:
+        invalidate(TITLES_VERSION, *(
+            TITLE_VERSION.format(pk=pk) for pk in pk_set
+        ))
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genre(sender, **kwargs):
+    invalidate(GENRES_VERSION, TITLES_VERSION, TITLES_DETAIL_VERSION)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, **kwargs):
+    invalidate(CATEGORIES_VERSION, TITLES_VERSION, TITLES_DETAIL_VERSION)
+
+
+@receiver(post_save, sender=Review)
+def invalidate_review(sender, instance, **kwargs):
+    invalidate(
+        TITLES_VERSION,
+        TITLE_VERSION.format(pk=instance.title_id),
+        TITLE_REVIEWS_VERSION.format(title_id=instance.title_id),
+    )
+
+
+@receiver(post_delete, sender=Review)
+def invalidate_deleted_review(sender, instance, **kwargs):
+    invalidate(
+        TITLES_VERSION,
+        TITLE_VERSION.format(pk=instance.title_id),
+        TITLE_REVIEWS_VERSION.format(title_id=instance.title_id),
+        REVIEW_COMMENTS_VERSION.format(review_id=instance.pk),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    if is_deleting(Review, instance.review_id):
+        # Версии удаляемого отзыва сбросит invalidate_deleted_review.
+        return
+    invalidate(REVIEW_COMMENTS_VERSION.format(review_id=instance.review_id))
+    if Comment.review.is_cached(instance):
+        invalidate(TITLE_REVIEWS_VERSION.format(
+            title_id=instance.review.title_id))
+    else:
+        invalidate_review_titles(instance.review_id)
+
+
+def invalidate_review_titles(review_id):
+    """Сбрасывает списки отзывов произведения, к которому относится отзыв.
+
+    Используется, когда отзыв не загружен (например, при каскадном
+    удалении комментариев пользователя): id произведений читаются после
+    фиксации транзакции одним запросом на все накопленные отзывы.
+    """
+    if not hasattr(_pending, 'review_ids'):
+        _pending.review_ids = set()
+    _pending.review_ids.add(review_id)
+    transaction.on_commit(flush_review_titles)
+
+
+def flush_review_titles():
+    review_ids = getattr(_pending, 'review_ids', set())
+    _pending.review_ids = set()
+    if not review_ids:
+        return
+    title_ids = Review.objects.filter(pk__in=review_ids).values_list(
+        'title_id', flat=True).distinct()
+    bump_versions(*(
+        TITLE_REVIEWS_VERSION.format(title_id=title_id)
+        for title_id in title_ids
+    ))
+
+
+def username_changed(instance, created, update_fields):
+    """Изменился ли username сохранённого пользователя.
+
+    Username выводится в списках отзывов и комментариев, поэтому только его
+    смена сбрасывает их ETag; регистрация и правка профиля их не трогают.
+    Если исходное значение не загружено, считается, что username изменился.
+    """
+    if created:
+        return False
+    if update_fields is not None and 'username' not in update_fields:
+        return False
+    loaded = getattr(instance, '_loaded_values', {})
+    return loaded.get('username') != instance.username
+
+
+@receiver(post_save, sender=User)
+def invalidate_saved_user(sender, instance, created, update_fields,
+                          **kwargs):
+    if username_changed(instance, created, update_fields):
+        invalidate(USERS_VERSION)
+    user_cache.invalidate(instance.pk)
+    invalidate_token_version(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    invalidate(USERS_VERSION)
+    user_cache.invalidate(instance.pk)
+    invalidate_token_version(instance.pk)
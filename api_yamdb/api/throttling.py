@@ -0,0 +1,97 @@
+"""Ограничение частоты запросов к регистрации и выдаче токенов.
+
+Каждый запрос расходует по жетону из корзин своего IP-адреса, username и
+email. Корзины пополняются равномерно: `AUTH_RATE_LIMITS` задаёт для
+каждого ключа ёмкость и время полного пополнения в секундах. Корзины
+хранятся в памяти процесса, а при заданном `AUTH_RATE_LIMIT_CACHE_ALIAS`
+— в общем кэше Django, чтобы лимит был общим для всех воркеров. Запись в
+кэш не атомарна, поэтому при одновременных запросах лимит может быть
+превышен на несколько запросов.
+"""
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+BUCKET_KEY = 'auth-rate-limits:{key}'
+
+
+class TokenBuckets:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get_shared_cache(self):
+        alias = settings.AUTH_RATE_LIMIT_CACHE_ALIAS
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def take(state, now, capacity, period):
+        """Новое состояние корзины и время ожидания жетона в секундах."""
+        tokens, updated_at = state or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated_at) * capacity / period)
+        if tokens >= 1:
+            return (tokens - 1, now), 0
+        return (tokens, now), (1 - tokens) * period / capacity
+
+    def consume(self, key, capacity, period):
+        """Забирает жетон; возвращает 0 или время ожидания в секундах."""
+        shared = self.get_shared_cache()
+        if shared is not None:
+            cache_key = BUCKET_KEY.format(key=key)
+            state, wait = self.take(
+                shared.get(cache_key), time.time(), capacity, period)
+            shared.set(cache_key, state, period)
+            return wait
+        with self.lock:
+            state, wait = self.take(
+                self.entries.pop(key, None), time.monotonic(), capacity,
+                period)
+            self.entries[key] = state
+            while len(self.entries) > settings.AUTH_RATE_LIMIT_SIZE:
+                self.entries.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+buckets = TokenBuckets()
+
+
+class AuthRateThrottle(BaseThrottle):
+    """Лимит запросов по IP-адресу, username и email.
+
+    Корзины разделены по `throttle_scope` представления. Тело запроса ещё
+    не проверено сериализатором, поэтому для тела не в виде словаря
+    применяется только лимит по IP-адресу.
+    """
+
+    def get_keys(self, request, view):
+        scope = getattr(view, 'throttle_scope', view.__class__.__name__)
+        values = {'ip': self.get_ident(request)}
+        data = request.data if isinstance(request.data, Mapping) else {}
+        for field in ('username', 'email'):
+            value = data.get(field)
+            if isinstance(value, str) and value:
+                values[field] = value.lower()
+        for name, value in values.items():
+            yield name, f'{scope}:{name}:{value}'
+
+    def allow_request(self, request, view):
+        self.retry_after = 0
+        for name, key in self.get_keys(request, view):
+            capacity, period = settings.AUTH_RATE_LIMITS[name]
+            self.retry_after = buckets.consume(key, capacity, period)
+            if self.retry_after:
+                return False
+        return True
+
+    def wait(self):
+        return self.retry_after
@@ -1,14 +1,25 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       ReviewViewSet, SignUpView, TitleViewSet, TokenView,
-                       UserViewSet)
+from api.views import (AuthorCommentViewSet, AuthorReviewViewSet,
+                       CategoryViewSet, CommentViewSet, ExportView,
+                       GenreViewSet, ReviewViewSet, SignUpView, TitleViewSet,
+                       TokenView, UserViewSet)
 
 
 API_VERSION = 'v1'
 router_v1 = DefaultRouter()
 router_v1.register('users', UserViewSet, basename='user')
+router_v1.register(
+    r'users/(?P<username>[\w.@+-]+)/reviews',
+    AuthorReviewViewSet,
+    basename='user-reviews'
+)
+router_v1.register(
+    r'users/(?P<username>[\w.@+-]+)/comments',
+    AuthorCommentViewSet,
+    basename='user-comments'
+)
 router_v1.register(r'categories', CategoryViewSet, basename='categories')
 router_v1.register(r'genres', GenreViewSet, basename='genres')
 router_v1.register(r'titles', TitleViewSet, basename='titles')
@@ -29,5 +40,7 @@ auth_urls = [
 
 urlpatterns = [
     path(f'{API_VERSION}/auth/', include(auth_urls)),
+    path(f'{API_VERSION}/export/reviews/', ExportView.as_view(),
+         name='export-reviews'),
     path(f'{API_VERSION}/', include(router_v1.urls)),
 ]
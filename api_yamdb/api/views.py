@@ -1,24 +1,48 @@
-from random import randint
+import secrets
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Avg
+from django.db.models import Count, F, OuterRef, Prefetch, Subquery
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import (filters, mixins, pagination, permissions, response,
                             status, views, viewsets)
 from rest_framework.decorators import action
-
-from api import serializers
-from api.filters import TitleFilter
+from rest_framework.settings import api_settings
+
+from api import cache, serializers
+from api.authentication import load_user
+from api.constants import MAX_RATING, MIN_RATING
+from api.export import export_lines
+from api.filters import TitleFilter, TitleSearchFilter
+from api.mail import dispatcher
+from api.pagination import (AuthorFeedPagination, ReviewCommentPagination,
+                            TitlePagination)
 from api.permissions import AdminPermission, IsAdminOnly, IsAuthorOrReadOnly
-from reviews.models import Category, Genre, Review, Title
+from api.throttling import AuthRateThrottle
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry,
+                            Review, Title, TitleYearCount)
+from users.codes import get_code_store
 
 User = get_user_model()
 
 
+def collect_values(items, field):
+    """Собирает значения поля из элементов пакетного запроса."""
+    values = set()
+    for item in items:
+        value = item.get(field) if isinstance(item, dict) else None
+        for element in value if isinstance(value, list) else [value]:
+            if isinstance(element, str) or (
+                    isinstance(element, int)
+                    and not isinstance(element, bool)):
+                values.add(element)
+    return values
+
+
 class CreateDestroyViewSet(
+    cache.ConditionalListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -32,16 +56,18 @@ class CreateDestroyViewSet(
 
 class SignUpView(views.APIView):
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (AuthRateThrottle,)
+    throttle_scope = 'auth-signup'
 
     def post(self, request):
         serializer = serializers.SignUpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         email = serializer.validated_data['email']
         user = serializer.save()
-        confirmation_code = str(randint(10000, 99999))
-        user.set_confirmation_code(confirmation_code)
+        confirmation_code = str(secrets.randbelow(90000) + 10000)
+        get_code_store().issue(user, confirmation_code)
 
-        send_mail(
+        queued = dispatcher.submit(
             subject='Код подтверждения API Yamdb',
             message=(
                 f'Здравствуйте, {user.username}!\n'
@@ -51,8 +77,13 @@ class SignUpView(views.APIView):
             ),
             from_email=settings.EMAIL_BASE,
             recipient_list=[email],
-            fail_silently=True,
         )
+        if not queued:
+            return response.Response(
+                {'detail': 'Не удалось отправить код подтверждения, '
+                           'повторите запрос позже.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
 
         return response.Response(
             serializer.validated_data, status=status.HTTP_200_OK
@@ -61,6 +92,8 @@ class SignUpView(views.APIView):
 
 class TokenView(views.APIView):
     permission_classes = (permissions.AllowAny, )
+    throttle_classes = (AuthRateThrottle,)
+    throttle_scope = 'auth-token'
 
     def post(self, request):
         serializer = serializers.TokenSerializer(data=request.data)
@@ -74,37 +107,185 @@ class TokenView(views.APIView):
         )
 
 
+class ExportView(views.APIView):
+    """Потоковая выгрузка отзывов и комментариев в NDJSON."""
+
+    permission_classes = (permissions.IsAuthenticated, IsAdminOnly)
+
+    def get(self, request):
+        query = serializers.ExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        return StreamingHttpResponse(
+            export_lines(since=query.validated_data.get('since')),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+
+
 class CategoryViewSet(CreateDestroyViewSet):
     queryset = Category.objects.all().order_by('name')
     serializer_class = serializers.CategorySerializer
+    version_keys = (cache.CATEGORIES_VERSION,)
 
 
 class GenreViewSet(CreateDestroyViewSet):
     queryset = Genre.objects.all()
     serializer_class = serializers.GenreSerializer
+    version_keys = (cache.GENRES_VERSION,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')
-    ).all().order_by('name')
+class TitleViewSet(cache.ConditionalResponseMixin, viewsets.ModelViewSet):
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre').order_by('name')
     serializer_class = serializers.TitleSerializer
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter)
+    filter_backends = (DjangoFilterBackend, TitleSearchFilter)
     filterset_class = TitleFilter
     search_fields = ('name', 'description')
+    pagination_class = TitlePagination
     permission_classes = [AdminPermission]
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
+    version_keys = (cache.TITLES_VERSION,)
+    detail_version_keys = (cache.TITLES_DETAIL_VERSION, cache.TITLE_VERSION)
+    cache_responses = True
+
+    @action(detail=False, methods=['get'], url_path='facets')
+    def facets(self, request):
+        return self.versioned_response(self.get_facets, request)
+
+    def get_facets(self, request):
+        """Количество произведений по жанрам, категориям и годам.
+
+        Без фильтров значения берутся из счётчиков, с фильтрами
+        `TitleFilter` или поиском считаются группировкой по выборке.
+        """
+        params = (*TitleFilter.base_filters, api_settings.SEARCH_PARAM)
+        if any(param in request.query_params for param in params):
+            titles = self.filter_queryset(
+                Title.objects.all()).order_by().values('pk')
+            genres = Genre.objects.filter(titles__in=titles).values(
+                'name', 'slug').annotate(count=Count('pk')).order_by('name')
+            categories = Category.objects.filter(titles__in=titles).values(
+                'name', 'slug').annotate(count=Count('pk')).order_by('name')
+            years = Title.objects.filter(pk__in=titles).values(
+                'year').annotate(count=Count('pk')).order_by('year')
+        else:
+            genres = Genre.objects.filter(titles_count__gt=0).values(
+                'name', 'slug', count=F('titles_count'))
+            categories = Category.objects.filter(titles_count__gt=0).values(
+                'name', 'slug', count=F('titles_count'))
+            years = TitleYearCount.objects.filter(titles_count__gt=0).values(
+                'year', count=F('titles_count'))
+        return response.Response({
+            'genre': list(genres),
+            'category': list(categories),
+            'year': list(years),
+        })
+
+    @action(detail=False, methods=['get'], url_path='top')
+    def top(self, request):
+        return self.versioned_response(self.get_top, request)
+
+    def get_top(self, request):
+        """Лучшие произведения по предрасчитанному рейтингу."""
+        query = serializers.LeaderboardQuerySerializer(
+            data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        entries = LeaderboardEntry.objects.filter(
+            reviews_count__gte=params['min_reviews'])
+        if 'genre' in params:
+            entries = entries.filter(genre__slug=params['genre'])
+        else:
+            entries = entries.filter(genre__isnull=True)
+        if 'category' in params:
+            entries = entries.filter(category__slug=params['category'])
+        if 'year' in params:
+            entries = entries.filter(year=params['year'])
+        entries = entries.select_related(
+            'title__category'
+        ).prefetch_related('title__genre')[:params['limit']]
+        return response.Response(serializers.TitleSerializer(
+            [entry.title for entry in entries], many=True).data)
+
+    @action(detail=True, methods=['get'], url_path='scores')
+    def scores(self, request, pk=None):
+        return self.versioned_response(self.get_scores, request, pk=pk)
+
+    def get_scores(self, request, pk=None):
+        """Распределение оценок произведения по сохранённым счётчикам."""
+        title = get_object_or_404(Title.objects.only('reviews_count'), pk=pk)
+        counts = dict(title.score_counts.values_list('score', 'reviews_count'))
+        return response.Response({
+            'reviews_count': title.reviews_count,
+            'scores': [
+                {'score': score, 'count': counts.get(score, 0)}
+                for score in range(MIN_RATING, MAX_RATING + 1)
+            ],
+        })
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        if not isinstance(request.data, list):
+            return response.Response(
+                {'detail': 'Ожидается список произведений.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        title_ids = {
+            int(value) for value in collect_values(request.data, 'id')
+            if str(value).isdigit()
+        }
+        context = self.get_serializer_context()
+        context.update(
+            categories=Category.objects.in_bulk(
+                collect_values(request.data, 'category'), field_name='slug'),
+            genres=Genre.objects.in_bulk(
+                collect_values(request.data, 'genre'), field_name='slug'),
+            titles=Title.objects.in_bulk(title_ids),
+        )
+        serializer = serializers.TitleBulkSerializer(
+            data=request.data, many=True, context=context)
+        serializer.is_valid(raise_exception=True)
+        ids = [title.pk for title in serializer.save()]
+        cache.invalidate(cache.TITLES_VERSION, cache.TITLES_DETAIL_VERSION)
 
+        titles = self.get_queryset().in_bulk(ids)
+        return response.Response(
+            serializers.TitleSerializer(
+                [titles[pk] for pk in ids], many=True).data,
+            status=status.HTTP_201_CREATED
+        )
 
-class ReviewViewSet(viewsets.ModelViewSet):
+
+class ReviewViewSet(cache.ConditionalResponseMixin, viewsets.ModelViewSet):
     serializer_class = serializers.ReviewSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly,
                           IsAuthorOrReadOnly]
-    pagination_class = pagination.LimitOffsetPagination
+    pagination_class = ReviewCommentPagination
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
+    version_keys = (cache.TITLE_REVIEWS_VERSION, cache.USERS_VERSION)
 
     def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs['title_id'])
+        """Произведение из URL, загружается один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title.objects.only('pk'), pk=self.kwargs['title_id'])
+        return self._title
+
+    def get_expand(self):
+        """Параметры встраивания комментариев из строки запроса."""
+        if self.action not in ('list', 'retrieve'):
+            return {}
+        if not hasattr(self, '_expand'):
+            query = serializers.ReviewExpandQuerySerializer(
+                data=self.request.query_params)
+            query.is_valid(raise_exception=True)
+            self._expand = query.validated_data
+        return self._expand
+
+    def get_serializer_class(self):
+        if 'expand' in self.get_expand():
+            return serializers.ReviewWithCommentsSerializer
+        return super().get_serializer_class()
 
     def perform_create(self, serializer):
         title = self.get_title()
@@ -112,22 +293,44 @@ class ReviewViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         title = self.get_title()
-        return title.reviews.all()
-
-
-class CommentViewSet(viewsets.ModelViewSet):
+        reviews = title.reviews.select_related('author')
+        expand = self.get_expand()
+        if 'expand' in expand:
+            # Последние комментарии всех отзывов страницы читаются одним
+            # запросом: коррелированный подзапрос с LIMIT отбирает не
+            # больше `comments_limit` комментариев на отзыв по индексу
+            # (review, pub_date).
+            latest = Comment.objects.filter(
+                review=OuterRef('review')
+            ).order_by('-pub_date', '-pk').values('pk')[
+                :expand['comments_limit']]
+            reviews = reviews.prefetch_related(Prefetch(
+                'comments',
+                queryset=Comment.objects.filter(
+                    pk__in=Subquery(latest)
+                ).select_related('author').order_by('-pub_date', '-pk'),
+                to_attr='latest_comments',
+            ))
+        return reviews
+
+
+class CommentViewSet(cache.ConditionalResponseMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly,
                           IsAuthorOrReadOnly]
     serializer_class = serializers.CommentSerializer
-    pagination_class = pagination.LimitOffsetPagination
+    pagination_class = ReviewCommentPagination
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
+    version_keys = (cache.REVIEW_COMMENTS_VERSION, cache.USERS_VERSION)
 
     def get_review(self):
-        return get_object_or_404(
-            Review,
-            id=self.kwargs['review_id'],
-            title_id=self.kwargs['title_id']
-        )
+        """Отзыв из URL, загружается один раз за запрос."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.only('pk', 'title_id'),
+                id=self.kwargs['review_id'],
+                title_id=self.kwargs['title_id']
+            )
+        return self._review
 
     def perform_create(self, serializer):
         review = self.get_review()
@@ -135,7 +338,44 @@ class CommentViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         review = self.get_review()
-        return review.comments.all()
+        return review.comments.select_related('author')
+
+
+class AuthorFeedViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Отзывы или комментарии пользователя по всем произведениям.
+
+    `me` вместо имени пользователя означает текущего пользователя.
+    """
+
+    pagination_class = AuthorFeedPagination
+
+    def get_permissions(self):
+        if self.kwargs.get('username') == 'me':
+            return [permissions.IsAuthenticated()]
+        return [permissions.AllowAny()]
+
+    def get_author(self):
+        if self.kwargs['username'] == 'me':
+            return self.request.user
+        return get_object_or_404(
+            User.objects.only('pk'), username=self.kwargs['username'])
+
+
+class AuthorReviewViewSet(AuthorFeedViewSet):
+    serializer_class = serializers.AuthorReviewSerializer
+
+    def get_queryset(self):
+        return Review.objects.filter(
+            author=self.get_author()).select_related('author')
+
+
+class AuthorCommentViewSet(AuthorFeedViewSet):
+    serializer_class = serializers.AuthorCommentSerializer
+
+    def get_queryset(self):
+        return Comment.objects.filter(
+            author=self.get_author()
+        ).select_related('author').annotate(title_id=F('review__title_id'))
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -151,13 +391,15 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get', 'patch'], url_path='me',
             permission_classes=[permissions.IsAuthenticated])
     def me(self, request):
-        user = request.user
         if request.method == 'GET':
-            serializer = self.get_serializer(user)
+            serializer = self.get_serializer(load_user(request.user.pk))
             return response.Response(
                 serializer.data, status=status.HTTP_200_OK)
+        # Запись идёт от свежей строки: копия из кэша процесса может быть
+        # устаревшей, и save() вернул бы старые роль и версию токенов.
         serializer = self.get_serializer(
-            user, data=request.data, partial=True
+            get_object_or_404(User, pk=request.user.pk),
+            data=request.data, partial=True
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
@@ -60,6 +60,7 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
@@ -101,11 +102,60 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+# Кэш ответов и версий данных (api.cache) должен быть общим для всех
+# процессов, иначе изменения из других процессов видны только по таймауту.
+TITLES_CACHE_ALIAS = 'default'
+TITLES_CACHE_TIMEOUT = 60 * 5
+
+# Кэш пользователей для JWT-аутентификации (api.authentication): LRU в
+# памяти процесса и, если задан псевдоним, общий кэш Django.
+USER_CACHE_TTL = 30
+USER_CACHE_SIZE = 1024
+USER_CACHE_ALIAS = None
+
+# Кэш текущих версий токенов. Пока он не общий для всех процессов, отзыв
+# токена доходит до других процессов не позже чем через таймаут.
+TOKEN_VERSION_CACHE_ALIAS = 'default'
+TOKEN_VERSION_CACHE_TIMEOUT = 30
+
+# Лимиты регистрации и выдачи токенов (api.throttling): ёмкость корзины и
+# время её полного пополнения в секундах для каждого ключа. Если задан
+# псевдоним кэша, корзины общие для всех процессов.
+AUTH_RATE_LIMITS = {
+    'ip': (20, 60),
+    'username': (5, 60),
+    'email': (5, 60),
+}
+AUTH_RATE_LIMIT_SIZE = 10000
+AUTH_RATE_LIMIT_CACHE_ALIAS = None
+
+WEIGHTED_RATING_MIN_VOTES = 10
+
+# Коды подтверждения (users.codes) по умолчанию хранятся в базе. Хранилище
+# users.codes.CacheCodeStore можно включить, только если кэш
+# CONFIRMATION_CODE_CACHE_ALIAS общий для всех процессов.
+CONFIRMATION_CODE_STORE = 'users.codes.DatabaseCodeStore'
+CONFIRMATION_CODE_CACHE_ALIAS = 'default'
+CONFIRMATION_CODE_TTL = timedelta(hours=1)
+CONFIRMATION_CODE_MAX_ATTEMPTS = 5
 
 EMAIL_BASE = 'no_reply@yambd.com'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Фоновая отправка писем (api.mail). При MAIL_DISPATCH_EAGER письма
+# отправляются сразу в потоке запроса.
+MAIL_DISPATCH_EAGER = False
+MAIL_QUEUE_SIZE = 1000
+MAIL_WORKERS = 2
+MAIL_RETRIES = 3
+MAIL_RETRY_DELAY = 1
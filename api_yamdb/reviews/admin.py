@@ -18,7 +18,7 @@ class GenreAdmin(admin.ModelAdmin):
 @admin.register(models.Title)
 class TitleAdmin(admin.ModelAdmin):
     list_display = ('name', 'year', 'display_genres', 'category',
-                    'description')
+                    'rating', 'description')
     list_filter = ('year', 'category')
     search_fields = ('name', 'year', 'description', 'category__name')
     list_editable = ('category',)
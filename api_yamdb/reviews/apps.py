@@ -1,7 +1,18 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_triggers(sender, using, **kwargs):
+    from reviews.fts import create_title_fts_triggers
+    create_title_fts_triggers(connections[using])
 
 
 class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
     verbose_name = 'Отзывы'
+
+    def ready(self):
+        from reviews import signals  # noqa: F401
+        post_migrate.connect(ensure_search_triggers, sender=self)
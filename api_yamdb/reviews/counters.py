@@ -0,0 +1,107 @@
+"""Счётчики произведений по жанрам, категориям и годам и отзывов по оценкам."""
+from django.db.models import (Case, Count, F, IntegerField, OuterRef,
+                              Subquery, Value, When)
+from django.db.models.functions import Coalesce
+
+from api.constants import BULK_BATCH_SIZE
+from reviews.models import (Category, Genre, GenreTitle, Review, Title,
+                            TitleScoreCount, TitleYearCount)
+
+
+def moved(old, new):
+    """Изменения счётчиков при переносе записи из `old` в `new`."""
+    if old == new:
+        return {}
+    return {old: -1, new: 1}
+
+
+def change_counts(queryset, field, deltas, counter='titles_count'):
+    """Прибавляет к `counter` записей с `field=key` значение `delta`.
+
+    Все изменения применяются одним UPDATE.
+    """
+    deltas = {
+        key: delta for key, delta in deltas.items()
+        if key is not None and delta
+    }
+    if not deltas:
+        return
+    queryset.filter(**{f'{field}__in': deltas}).update(**{
+        counter: F(counter) + Case(
+            *(When(**{field: key}, then=Value(delta))
+              for key, delta in deltas.items()),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    })
+
+
+def change_category_counts(deltas):
+    change_counts(Category.objects.all(), 'pk', deltas)
+
+
+def change_genre_counts(deltas):
+    change_counts(Genre.objects.all(), 'pk', deltas)
+
+
+def change_year_counts(deltas):
+    TitleYearCount.objects.bulk_create(
+        [TitleYearCount(year=year)
+         for year, delta in deltas.items() if delta > 0],
+        ignore_conflicts=True,
+    )
+    change_counts(TitleYearCount.objects.all(), 'year', deltas)
+
+
+def change_score_counts(title_id, deltas):
+    """Изменяет количество отзывов произведения по оценкам."""
+    TitleScoreCount.objects.bulk_create(
+        [TitleScoreCount(title_id=title_id, score=score)
+         for score, delta in deltas.items() if delta > 0],
+        ignore_conflicts=True,
+    )
+    change_counts(TitleScoreCount.objects.filter(title_id=title_id),
+                  'score', deltas, counter='reviews_count')
+
+
+def recompute_counters():
+    """Полностью пересобирает счётчики по текущим данным."""
+    for model, titles in ((Category, Title.objects.all()),
+                          (Genre, GenreTitle.objects.all())):
+        counts = titles.filter(
+            **{model._meta.model_name: OuterRef('pk')}
+        ).order_by().values(model._meta.model_name).annotate(
+            total=Count('pk')
+        ).values('total')
+        model.objects.update(titles_count=Coalesce(Subquery(counts), 0))
+
+    years = Title.objects.order_by().values('year').annotate(
+        total=Count('pk')
+    )
+    TitleYearCount.objects.exclude(
+        year__in=[row['year'] for row in years]
+    ).delete()
+    for row in years:
+        TitleYearCount.objects.update_or_create(
+            year=row['year'], defaults={'titles_count': row['total']}
+        )
+
+
+def recompute_score_counts(title_ids=None):
+    """Пересобирает распределение оценок по таблице отзывов.
+
+    Без `title_ids` пересобираются счётчики всех произведений.
+    """
+    counts = TitleScoreCount.objects.all()
+    reviews = Review.objects.order_by()
+    if title_ids is not None:
+        counts = counts.filter(title_id__in=title_ids)
+        reviews = reviews.filter(title_id__in=title_ids)
+    counts.delete()
+    TitleScoreCount.objects.bulk_create(
+        (TitleScoreCount(title_id=row['title'], score=row['score'],
+                         reviews_count=row['total'])
+         for row in reviews.values('title', 'score').annotate(
+             total=Count('pk'))),
+        batch_size=BULK_BATCH_SIZE,
+    )
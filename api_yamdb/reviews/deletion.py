@@ -0,0 +1,44 @@
+"""Отметки о записях, которые удаляются вместе с зависимыми.
+
+Сигналы pre_delete приходят для всех собранных записей до удаления первой
+из них. Зависимые записи по отметкам не обновляют счётчики и кэш родителя,
+который удаляется той же операцией. Отметки живут только внутри
+`deletion_scope()`: удаление вне его просто выполняет обновления для
+каждой записи.
+"""
+from contextlib import contextmanager
+from threading import local
+
+_deleting = local()
+
+
+@contextmanager
+def deletion_scope():
+    """Хранит отметки до конца операции удаления, в том числе с ошибкой."""
+    if hasattr(_deleting, 'objects'):
+        yield
+        return
+    _deleting.objects = set()
+    try:
+        yield
+    finally:
+        del _deleting.objects
+
+
+def mark_deleting(model, pk):
+    objects = getattr(_deleting, 'objects', None)
+    if objects is not None:
+        objects.add((model, pk))
+
+
+def is_deleting(model, pk):
+    """Удаляется ли запись текущей операцией удаления."""
+    return (model, pk) in getattr(_deleting, 'objects', ())
+
+
+class DeletionScopeMixin:
+    """Выполняет delete() модели или QuerySet внутри `deletion_scope()`."""
+
+    def delete(self, *args, **kwargs):
+        with deletion_scope():
+            return super().delete(*args, **kwargs)
@@ -0,0 +1,105 @@
+"""Полнотекстовый индекс SQLite FTS5 по названию и описанию произведений."""
+from django.db import connections
+
+TITLE_TABLE = 'reviews_title'
+TITLE_FTS_TABLE = 'reviews_title_fts'
+TITLE_FTS_COLUMNS = ('name', 'description')
+
+
+def title_fts_supported(connection):
+    return connection.vendor == 'sqlite'
+
+
+def create_title_fts_triggers(connection):
+    """Создаёт триггеры синхронизации индекса, если их нет.
+
+    SQLite пересоздаёт таблицу произведений при изменении её схемы и
+    при этом удаляет триггеры, поэтому функция вызывается после каждой
+    миграции.
+    """
+    if not title_fts_supported(connection):
+        return
+    columns = ', '.join(TITLE_FTS_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in TITLE_FTS_COLUMNS)
+    old_values = ', '.join(f'old.{column}' for column in TITLE_FTS_COLUMNS)
+    insert_new = (
+        f'INSERT INTO {TITLE_FTS_TABLE}(rowid, {columns}) '
+        f'VALUES (new.id, {new_values});'
+    )
+    delete_old = (
+        f'INSERT INTO {TITLE_FTS_TABLE}({TITLE_FTS_TABLE}, rowid, {columns}) '
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+    with connection.cursor() as cursor:
+        if TITLE_FTS_TABLE not in connection.introspection.table_names(
+                cursor):
+            return
+        cursor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {TITLE_FTS_TABLE}_ai AFTER INSERT '
+            f'ON {TITLE_TABLE} BEGIN {insert_new} END'
+        )
+        cursor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {TITLE_FTS_TABLE}_ad AFTER DELETE '
+            f'ON {TITLE_TABLE} BEGIN {delete_old} END'
+        )
+        cursor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {TITLE_FTS_TABLE}_au AFTER UPDATE '
+            f'OF {columns} ON {TITLE_TABLE} BEGIN {delete_old} {insert_new} '
+            'END'
+        )
+
+
+def create_title_fts(connection):
+    """Создаёт FTS5-таблицу и триггеры синхронизации с таблицей произведений.
+
+    Индекс хранит только токены (external content), тексты читаются из
+    самой таблицы произведений. При создании индекс заполняется
+    существующими записями.
+    """
+    if not title_fts_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE {TITLE_FTS_TABLE} USING fts5('
+            f"{', '.join(TITLE_FTS_COLUMNS)}, content='{TITLE_TABLE}', "
+            "content_rowid='id')"
+        )
+        cursor.execute(
+            f"INSERT INTO {TITLE_FTS_TABLE}({TITLE_FTS_TABLE}) "
+            "VALUES ('rebuild')"
+        )
+    create_title_fts_triggers(connection)
+
+
+def drop_title_fts(connection):
+    if not title_fts_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        for suffix in ('ai', 'ad', 'au'):
+            cursor.execute(
+                f'DROP TRIGGER IF EXISTS {TITLE_FTS_TABLE}_{suffix}'
+            )
+        cursor.execute(f'DROP TABLE IF EXISTS {TITLE_FTS_TABLE}')
+
+
+def build_match_query(terms):
+    """Превращает поисковые слова в запрос FTS5 с поиском по префиксу."""
+    return ' '.join(
+        '"{}"*'.format(term.replace('"', '""')) for term in terms
+    )
+
+
+def search_titles(queryset, terms):
+    """Фильтрует произведения по индексу и сортирует по релевантности."""
+    if not title_fts_supported(connections[queryset.db]):
+        return None
+    return queryset.extra(
+        select={'search_rank': f'{TITLE_FTS_TABLE}.rank'},
+        tables=[TITLE_FTS_TABLE],
+        where=[
+            f'{TITLE_FTS_TABLE}.rowid = {TITLE_TABLE}.id',
+            f'{TITLE_FTS_TABLE} MATCH %s',
+        ],
+        params=[build_match_query(terms)],
+        order_by=['search_rank', 'name'],
+    )
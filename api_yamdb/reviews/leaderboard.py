@@ -0,0 +1,86 @@
+"""Предрасчитанный рейтинг лучших произведений.
+
+Изменения применяются после фиксации транзакции: к этому моменту
+каскадное удаление уже завершено, и строки не создаются заново для
+удаляемых произведений.
+"""
+from django.db import transaction
+
+from api.constants import BULK_BATCH_SIZE
+from reviews.models import GenreTitle, LeaderboardEntry, Title
+
+
+def build_entries(titles):
+    genres = {}
+    for title_id, genre_id in GenreTitle.objects.filter(
+        title__in=[title.pk for title in titles]
+    ).values_list('title_id', 'genre_id'):
+        genres.setdefault(title_id, []).append(genre_id)
+    return [
+        LeaderboardEntry(
+            title_id=title.pk,
+            genre_id=genre_id,
+            category_id=title.category_id,
+            year=title.year,
+            score=title.score_sum / title.reviews_count,
+            reviews_count=title.reviews_count,
+        )
+        for title in titles
+        for genre_id in [None, *genres.get(title.pk, [])]
+    ]
+
+
+@transaction.atomic
+def refresh_titles(title_ids):
+    """Пересоздаёт строки рейтинга для указанных произведений."""
+    LeaderboardEntry.objects.filter(title__in=title_ids).delete()
+    titles = Title.objects.filter(
+        pk__in=title_ids, reviews_count__gt=0
+    ).only('category', 'year', 'score_sum', 'reviews_count')
+    LeaderboardEntry.objects.bulk_create(build_entries(list(titles)))
+
+
+@transaction.atomic
+def update_scores(title_id):
+    """Обновляет оценку произведения во всех его строках рейтинга."""
+    entries = LeaderboardEntry.objects.filter(title_id=title_id)
+    # Транзакция начинается с записи: в SQLite транзакция, которая сначала
+    # читает, а потом пишет, при параллельной записи сразу завершается
+    # ошибкой блокировки вместо ожидания.
+    entries.filter(title__reviews_count=0).delete()
+    title = Title.objects.filter(pk=title_id).values(
+        'score_sum', 'reviews_count').first()
+    if title is None or not title['reviews_count']:
+        return
+    if not entries.update(
+        score=title['score_sum'] / title['reviews_count'],
+        reviews_count=title['reviews_count'],
+    ):
+        refresh_titles([title_id])
+
+
+@transaction.atomic
+def rebuild(batch_size=BULK_BATCH_SIZE):
+    """Полностью пересобирает рейтинг."""
+    LeaderboardEntry.objects.all().delete()
+    titles = Title.objects.filter(reviews_count__gt=0).only(
+        'category', 'year', 'score_sum', 'reviews_count').order_by('pk')
+    batch = []
+    for title in titles.iterator(chunk_size=batch_size):
+        batch.append(title)
+        if len(batch) == batch_size:
+            LeaderboardEntry.objects.bulk_create(build_entries(batch))
+            batch = []
+    LeaderboardEntry.objects.bulk_create(build_entries(batch))
+
+
+def schedule_refresh(*title_ids):
+    transaction.on_commit(lambda: refresh_titles(title_ids))
+
+
+def schedule_update(title_id):
+    transaction.on_commit(lambda: update_scores(title_id))
+
+
+def schedule_rebuild():
+    transaction.on_commit(rebuild)
@@ -0,0 +1,24 @@
+# Generated by Django 3.2 on 2026-10-18 04:54
+
+from django.db import migrations
+
+from reviews.fts import create_title_fts, drop_title_fts
+
+
+def create_fts(apps, schema_editor):
+    create_title_fts(schema_editor.connection)
+
+
+def drop_fts(apps, schema_editor):
+    drop_title_fts(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 3.2 on 2026-10-18 04:56
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counters(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    TitleYearCount = apps.get_model('reviews', 'TitleYearCount')
+    for model, titles, field in (
+        (apps.get_model('reviews', 'Category'), Title.objects, 'category'),
+        (apps.get_model('reviews', 'Genre'), GenreTitle.objects, 'genre'),
+    ):
+        counts = titles.order_by().values(field).annotate(total=Count('pk'))
+        for row in counts:
+            model.objects.filter(pk=row[field]).update(
+                titles_count=row['total'])
+    TitleYearCount.objects.bulk_create(
+        TitleYearCount(year=row['year'], titles_count=row['total'])
+        for row in Title.objects.order_by().values('year').annotate(
+            total=Count('pk'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_title_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleYearCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.SmallIntegerField(unique=True, verbose_name='Год выпуска')),
+                ('titles_count', models.PositiveIntegerField(default=0, verbose_name='Количество произведений')),
+            ],
+            options={
+                'verbose_name': 'Количество произведений за год',
+                'verbose_name_plural': 'Количество произведений по годам',
+                'ordering': ('year',),
+            },
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='titles_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество произведений'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='titles_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество произведений'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 3.2 on 2026-10-18 05:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_leaderboard(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    LeaderboardEntry = apps.get_model('reviews', 'LeaderboardEntry')
+    genres = {}
+    for title_id, genre_id in GenreTitle.objects.values_list(
+            'title_id', 'genre_id'):
+        genres.setdefault(title_id, []).append(genre_id)
+    LeaderboardEntry.objects.bulk_create(
+        (
+            LeaderboardEntry(
+                title_id=title.pk,
+                genre_id=genre_id,
+                category_id=title.category_id,
+                year=title.year,
+                score=title.score_sum / title.reviews_count,
+                reviews_count=title.reviews_count,
+            )
+            for title in Title.objects.filter(reviews_count__gt=0)
+            for genre_id in [None, *genres.get(title.pk, [])]
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.SmallIntegerField(verbose_name='Год выпуска')),
+                ('score', models.FloatField(verbose_name='Средняя оценка')),
+                ('reviews_count', models.PositiveIntegerField(verbose_name='Количество отзывов')),
+                ('category', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='leaderboard_entries', to='reviews.category', verbose_name='Категория')),
+                ('genre', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.genre', verbose_name='Жанр')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Позиция в рейтинге',
+                'verbose_name_plural': 'Рейтинг произведений',
+                'ordering': ('-score', '-reviews_count', 'title'),
+                'default_related_name': 'leaderboard_entries',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['genre', '-score', '-reviews_count', 'title'], name='leaderboard_genre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['genre', 'category', '-score', '-reviews_count', 'title'], name='leaderboard_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['genre', 'year', '-score', '-reviews_count', 'title'], name='leaderboard_year_idx'),
+        ),
+        migrations.RunPython(fill_leaderboard, migrations.RunPython.noop),
+    ]
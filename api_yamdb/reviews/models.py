@@ -1,13 +1,53 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (Case, Count, F, IntegerField, OuterRef,
+                              Subquery, Sum, Value, When)
+from django.db.models.functions import Coalesce
 
 from api.constants import (CHARFIELD_MAX_LENGHT, LIMIT_STRING, MAX_RATING,
                            MIN_RATING)
 from api.validators import validate_year
+from reviews.deletion import DeletionScopeMixin
 from users.models import User
 
 
-class CategoryGenreBaseModel(models.Model):
+class LoadedValuesMixin:
+    """Запоминает значения полей, загруженные из базы."""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class StoredCountersMixin:
+    """Не записывает хранимые счётчики при сохранении существующей записи.
+
+    Счётчики меняются только запросами UPDATE с F(), поэтому save()
+    загруженного ранее объекта не затирает параллельные изменения.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                deferred = self.get_deferred_fields()
+                update_fields = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key
+                    and field.attname not in deferred
+                ]
+            kwargs['update_fields'] = [
+                name for name in update_fields
+                if name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class CategoryGenreBaseModel(StoredCountersMixin, models.Model):
     name = models.CharField(
         verbose_name='Название',
         max_length=CHARFIELD_MAX_LENGHT,
@@ -16,6 +56,13 @@ class CategoryGenreBaseModel(models.Model):
         verbose_name='Слаг',
         unique=True,
     )
+    titles_count = models.PositiveIntegerField(
+        verbose_name='Количество произведений',
+        default=0,
+        editable=False,
+    )
+
+    counter_fields = ('titles_count',)
 
     class Meta:
         ordering = ('name',)
@@ -33,7 +80,8 @@ class ReviewComment(models.Model):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='reviews',
+        db_index=False,
+        related_name='%(class)ss',
     )
     pub_date = models.DateTimeField(
         verbose_name='Дата публикации',
@@ -60,7 +108,42 @@ class Genre(CategoryGenreBaseModel):
         verbose_name_plural = 'Жанры'
 
 
-class Title(models.Model):
+class TitleQuerySet(DeletionScopeMixin, models.QuerySet):
+
+    def refresh_rating(self):
+        """Пересчитывает рейтинг из сохранённых суммы и числа оценок."""
+        return self.update(rating=Case(
+            When(reviews_count=0, then=Value(None)),
+            default=F('score_sum') / F('reviews_count'),
+            output_field=IntegerField(),
+        ))
+
+    def apply_review_delta(self, score_delta, count_delta):
+        """Инкрементально обновляет агрегаты оценок произведений."""
+        self.update(
+            score_sum=F('score_sum') + score_delta,
+            reviews_count=F('reviews_count') + count_delta,
+        )
+        return self.refresh_rating()
+
+    def recompute_ratings(self):
+        """Полностью пересобирает агрегаты оценок по таблице отзывов."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        self.update(
+            score_sum=Coalesce(Subquery(
+                reviews.annotate(total=Sum('score')).values('total')
+            ), 0),
+            reviews_count=Coalesce(Subquery(
+                reviews.annotate(total=Count('pk')).values('total')
+            ), 0),
+        )
+        return self.refresh_rating()
+
+
+class Title(LoadedValuesMixin, StoredCountersMixin, DeletionScopeMixin,
+            models.Model):
     name = models.CharField(
         verbose_name='Название',
         max_length=CHARFIELD_MAX_LENGHT,
@@ -76,6 +159,7 @@ class Title(models.Model):
     )
     genre = models.ManyToManyField(
         Genre,
+        through='GenreTitle',
         related_name='titles',
         verbose_name='Slug жанра',
     )
@@ -86,9 +170,42 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Slug категории',
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    reviews_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False,
+    )
+    rating = models.PositiveSmallIntegerField(
+        verbose_name='Рейтинг',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    weighted_rating = models.FloatField(
+        verbose_name='Взвешенный рейтинг',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+
+    objects = TitleQuerySet.as_manager()
+
+    counter_fields = ('score_sum', 'reviews_count', 'rating',
+                      'weighted_rating')
 
     class Meta:
         ordering = ('name',)
+        indexes = [
+            models.Index(fields=['name'], name='title_name_idx'),
+            models.Index(fields=['category', 'name'],
+                         name='title_category_name_idx'),
+            models.Index(fields=['year', 'name'], name='title_year_name_idx'),
+        ]
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
 
@@ -96,7 +213,155 @@ class Title(models.Model):
         return self.name
 
 
-class Review(ReviewComment):
+class TitleYearCount(models.Model):
+    year = models.SmallIntegerField(
+        verbose_name='Год выпуска',
+        unique=True,
+    )
+    titles_count = models.PositiveIntegerField(
+        verbose_name='Количество произведений',
+        default=0,
+    )
+
+    class Meta:
+        ordering = ('year',)
+        verbose_name = 'Количество произведений за год'
+        verbose_name_plural = 'Количество произведений по годам'
+
+    def __str__(self):
+        return f'{self.year}: {self.titles_count}'
+
+
+class TitleScoreCount(models.Model):
+    """Количество отзывов произведения с данной оценкой."""
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        db_index=False,
+        verbose_name='Произведение',
+    )
+    score = models.PositiveSmallIntegerField(verbose_name='Оценка')
+    reviews_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+    )
+
+    class Meta:
+        default_related_name = 'score_counts'
+        ordering = ('title', 'score')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'],
+                name='unique_title_score')]
+        verbose_name = 'Количество оценок'
+        verbose_name_plural = 'Распределение оценок'
+
+    def __str__(self):
+        return f'{self.title} - {self.score}: {self.reviews_count}'
+
+
+class GenreTitle(models.Model):
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        db_index=False,
+        verbose_name='Произведение',
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        db_index=False,
+        verbose_name='Жанр',
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'genre'],
+                name='unique_genre_title')]
+        indexes = [
+            models.Index(fields=['genre', 'title'],
+                         name='genre_title_genre_idx'),
+        ]
+        verbose_name = 'Жанр произведения'
+        verbose_name_plural = 'Жанры произведений'
+
+    def __str__(self):
+        return f'{self.title} - {self.genre}'
+
+
+class LeaderboardEntry(models.Model):
+    """Строка рейтинга лучших произведений.
+
+    Для каждого произведения с отзывами хранится строка без жанра (общий
+    рейтинг) и по строке на каждый его жанр, так что выборка по любому
+    сочетанию жанра, категории и года читается по индексу.
+    """
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        verbose_name='Произведение',
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        null=True,
+        db_index=False,
+        verbose_name='Жанр',
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        db_index=False,
+        verbose_name='Категория',
+    )
+    year = models.SmallIntegerField(verbose_name='Год выпуска')
+    score = models.FloatField(verbose_name='Средняя оценка')
+    reviews_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+    )
+
+    class Meta:
+        default_related_name = 'leaderboard_entries'
+        ordering = ('-score', '-reviews_count', 'title')
+        indexes = [
+            models.Index(
+                fields=['genre', '-score', '-reviews_count', 'title'],
+                name='leaderboard_genre_idx'),
+            models.Index(
+                fields=['genre', 'category', '-score', '-reviews_count',
+                        'title'],
+                name='leaderboard_category_idx'),
+            models.Index(
+                fields=['genre', 'year', '-score', '-reviews_count',
+                        'title'],
+                name='leaderboard_year_idx'),
+        ]
+        verbose_name = 'Позиция в рейтинге'
+        verbose_name_plural = 'Рейтинг произведений'
+
+    def __str__(self):
+        return f'{self.title}: {self.score:.2f}'
+
+
+class ReviewQuerySet(DeletionScopeMixin, models.QuerySet):
+
+    def recompute_comments_counts(self):
+        """Пересобирает количество комментариев по таблице комментариев."""
+        comments = Comment.objects.filter(
+            review=OuterRef('pk')
+        ).order_by().values('review').annotate(
+            total=Count('pk')
+        ).values('total')
+        return self.update(
+            comments_count=Coalesce(Subquery(comments), 0))
+
+
+class Review(LoadedValuesMixin, StoredCountersMixin, DeletionScopeMixin,
+             ReviewComment):
     score = models.PositiveSmallIntegerField(
         verbose_name='Оценка',
         validators=[
@@ -109,16 +374,36 @@ class Review(ReviewComment):
         on_delete=models.CASCADE,
         verbose_name='Произведение',
     )
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False,
+    )
 
-    class Meta:
+    objects = ReviewQuerySet.as_manager()
+
+    counter_fields = ('comments_count',)
+
+    class Meta(ReviewComment.Meta):
         default_related_name = 'reviews'
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'],
                 name='unique_review')]
+        indexes = [
+            models.Index(fields=['title', 'pub_date'],
+                         name='review_title_pub_date_idx'),
+            models.Index(fields=['author', 'pub_date'],
+                         name='review_author_pub_date_idx'),
+            models.Index(fields=['pub_date'], name='review_pub_date_idx'),
+        ]
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Comment(ReviewComment):
     review = models.ForeignKey(
@@ -126,7 +411,14 @@ class Comment(ReviewComment):
         verbose_name='Отзыв'
     )
 
-    class Meta:
+    class Meta(ReviewComment.Meta):
         default_related_name = 'comments'
+        indexes = [
+            models.Index(fields=['review', 'pub_date'],
+                         name='comment_review_pub_date_idx'),
+            models.Index(fields=['author', 'pub_date'],
+                         name='comment_author_pub_date_idx'),
+            models.Index(fields=['pub_date'], name='comment_pub_date_idx'),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
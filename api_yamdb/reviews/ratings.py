@@ -0,0 +1,58 @@
+"""Взвешенный (байесовский) рейтинг произведений.
+
+Рейтинг сглаживает среднюю оценку произведения к средней оценке по всем
+отзывам: WR = (v * R + m * C) / (v + m), где v — число отзывов, R —
+средняя оценка произведения, C — общая средняя оценка, m — «минимальное
+число голосов», вес априорного значения.
+"""
+import numpy as np
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+
+from reviews.models import Review, Title
+
+
+def read_scores(chunk_size):
+    """Читает столбцы `title_id` и `score` всех отзывов одним запросом."""
+    sql, params = Review.objects.order_by().values_list(
+        'title_id', 'score').query.sql_with_params()
+    chunks = []
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        while rows := cursor.fetchmany(chunk_size):
+            chunks.append(np.array(rows, dtype=np.int64))
+    if not chunks:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    data = np.concatenate(chunks)
+    return data[:, 0], data[:, 1]
+
+
+def weighted_ratings(title_ids, scores, min_votes):
+    """Возвращает id произведений с отзывами и их взвешенный рейтинг."""
+    sums = np.bincount(title_ids, weights=scores)
+    counts = np.bincount(title_ids)
+    reviewed = np.flatnonzero(counts)
+    ratings = (sums[reviewed] + min_votes * scores.mean()) / (
+        counts[reviewed] + min_votes)
+    return reviewed, ratings
+
+
+@transaction.atomic
+def recompute_weighted_ratings(min_votes, chunk_size=100_000):
+    """Пересчитывает и сохраняет взвешенный рейтинг всех произведений."""
+    title_ids, scores = read_scores(chunk_size)
+    Title.objects.filter(
+        ~Exists(Review.objects.filter(title=OuterRef('pk')))
+    ).update(weighted_rating=None)
+    if not scores.size:
+        return 0
+    reviewed, ratings = weighted_ratings(title_ids, scores, min_votes)
+    quote = connection.ops.quote_name
+    column = Title._meta.get_field('weighted_rating').column
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'UPDATE {quote(Title._meta.db_table)} SET {quote(column)} = %s '
+            f'WHERE {quote(Title._meta.pk.column)} = %s',
+            zip(ratings.tolist(), reviewed.tolist())
+        )
+    return len(reviewed)
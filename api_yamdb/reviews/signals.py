@@ -0,0 +1,172 @@
+from contextlib import contextmanager
+from threading import local
+
+from django.db.models import F
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from reviews.counters import (change_category_counts, change_genre_counts,
+                              change_score_counts, change_year_counts, moved,
+                              recompute_score_counts)
+from reviews.deletion import is_deleting, mark_deleting
+from reviews.leaderboard import schedule_refresh, schedule_update
+from reviews.models import Comment, GenreTitle, Review, Title
+
+_genre_counters = local()
+
+
+@receiver(pre_delete, sender=Title)
+@receiver(pre_delete, sender=Review)
+def remember_deleting(sender, instance, **kwargs):
+    mark_deleting(sender, instance.pk)
+
+
+@receiver(post_save, sender=Review)
+def update_title_rating_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    loaded = getattr(instance, '_loaded_values', {})
+    titles = Title.objects.filter(pk=instance.title_id)
+    if created:
+        titles.apply_review_delta(instance.score, 1)
+        change_score_counts(instance.title_id, {instance.score: 1})
+    elif not {'title_id', 'score'} <= loaded.keys():
+        titles.recompute_ratings()
+        recompute_score_counts([instance.title_id])
+    elif loaded['title_id'] != instance.title_id:
+        Title.objects.filter(pk=loaded['title_id']).apply_review_delta(
+            -loaded['score'], -1)
+        change_score_counts(loaded['title_id'], {loaded['score']: -1})
+        titles.apply_review_delta(instance.score, 1)
+        change_score_counts(instance.title_id, {instance.score: 1})
+        schedule_update(loaded['title_id'])
+    elif loaded['score'] != instance.score:
+        titles.apply_review_delta(instance.score - loaded['score'], 0)
+        change_score_counts(
+            instance.title_id, moved(loaded['score'], instance.score))
+    schedule_update(instance.title_id)
+    instance._loaded_values = {
+        'title_id': instance.title_id,
+        'score': instance.score,
+    }
+
+
+@receiver(post_delete, sender=Review)
+def update_title_rating_on_delete(sender, instance, **kwargs):
+    if is_deleting(Title, instance.title_id):
+        return
+    Title.objects.filter(pk=instance.title_id).apply_review_delta(
+        -instance.score, -1)
+    change_score_counts(instance.title_id, {instance.score: -1})
+    schedule_update(instance.title_id)
+
+
+@receiver(post_save, sender=Comment)
+def update_comments_count_on_save(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        Review.objects.filter(pk=instance.review_id).update(
+            comments_count=F('comments_count') + 1)
+
+
+@receiver(post_delete, sender=Comment)
+def update_comments_count_on_delete(sender, instance, **kwargs):
+    if is_deleting(Review, instance.review_id):
+        return
+    Review.objects.filter(pk=instance.review_id).update(
+        comments_count=F('comments_count') - 1)
+
+
+@receiver(pre_save, sender=Title)
+def load_title_facets(sender, instance, raw, update_fields, **kwargs):
+    """Читает прежние категорию и год, если они не были загружены.
+
+    Без них после сохранения нельзя вычислить изменения счётчиков.
+    """
+    if raw or instance.pk is None:
+        return
+    facets = {'category', 'category_id', 'year'}
+    if update_fields is not None and not facets & set(update_fields):
+        return
+    loaded = getattr(instance, '_loaded_values', {})
+    if {'category_id', 'year'} <= loaded.keys():
+        return
+    old = Title.objects.filter(pk=instance.pk).values(
+        'category_id', 'year').first()
+    if old is not None:
+        instance._loaded_values = {**loaded, **old}
+
+
+@receiver(post_save, sender=Title)
+def update_counters_on_title_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    loaded = getattr(instance, '_loaded_values', {})
+    if created:
+        change_category_counts({instance.category_id: 1})
+        change_year_counts({instance.year: 1})
+    elif not {'category_id', 'year'} <= loaded.keys():
+        # Категория и год не сохранялись.
+        return
+    elif (loaded['category_id'], loaded['year']) != (
+            instance.category_id, instance.year):
+        change_category_counts(
+            moved(loaded['category_id'], instance.category_id))
+        change_year_counts(moved(loaded['year'], instance.year))
+        schedule_refresh(instance.pk)
+    instance._loaded_values = {
+        **loaded,
+        'category_id': instance.category_id,
+        'year': instance.year,
+    }
+
+
+@receiver(post_delete, sender=Title)
+def update_counters_on_title_delete(sender, instance, **kwargs):
+    change_category_counts({instance.category_id: -1})
+    change_year_counts({instance.year: -1})
+
+
+@receiver(post_save, sender=GenreTitle)
+def update_genre_counter_on_save(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        change_genre_counts({instance.genre_id: 1})
+        schedule_refresh(instance.title_id)
+
+
+@contextmanager
+def genre_counters_skipped():
+    """Отключает обновление счётчиков при удалении связей с жанрами.
+
+    Пакетная запись произведений удаляет старые связи и сама обновляет
+    счётчики жанров и лидерборд одним запросом на всю пачку.
+    """
+    _genre_counters.skipped = True
+    try:
+        yield
+    finally:
+        _genre_counters.skipped = False
+
+
+@receiver(post_delete, sender=GenreTitle)
+def update_genre_counter_on_delete(sender, instance, **kwargs):
+    if getattr(_genre_counters, 'skipped', False):
+        return
+    change_genre_counts({instance.genre_id: -1})
+    if not is_deleting(Title, instance.title_id):
+        schedule_refresh(instance.title_id)
+
+
+@receiver(m2m_changed, sender=GenreTitle)
+def update_genre_counters_on_add(sender, instance, action, reverse, pk_set,
+                                 **kwargs):
+    # Связи, добавленные через `title.genre.add()`, создаются bulk_create
+    # без post_save; удаление любым способом приходит в post_delete.
+    if action != 'post_add':
+        return
+    if reverse:
+        change_genre_counts({instance.pk: len(pk_set)})
+        schedule_refresh(*pk_set)
+    else:
+        change_genre_counts({genre_id: 1 for genre_id in pk_set})
+        schedule_refresh(instance.pk)
@@ -0,0 +1,138 @@
+"""Хранилища кодов подтверждения.
+
+Код хранится как HMAC, привязанный к пользователю и времени выдачи,
+вместе со счётчиком неудачных попыток и не пишется в таблицу
+пользователей. Хранилище выбирается настройкой
+`CONFIRMATION_CODE_STORE`.
+"""
+import logging
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.module_loading import import_string
+
+from users.models import ConfirmationCode
+
+logger = logging.getLogger(__name__)
+
+
+def make_code_hash(user, code, created_at):
+    """HMAC кода, привязанный к пользователю и времени выдачи."""
+    return salted_hmac(
+        'users.codes.confirmation_code',
+        f'{user.pk}:{code}:{created_at.isoformat()}',
+        algorithm='sha256',
+    ).hexdigest()
+
+
+def is_expired(created_at):
+    return timezone.now() - created_at > settings.CONFIRMATION_CODE_TTL
+
+
+class DatabaseCodeStore:
+    """Коды в отдельной таблице `ConfirmationCode`."""
+
+    def issue(self, user, code):
+        created_at = timezone.now()
+        ConfirmationCode.objects.update_or_create(user=user, defaults={
+            'code_hash': make_code_hash(user, code, created_at),
+            'created_at': created_at,
+            'attempts': 0,
+        })
+
+    def check(self, user, code):
+        """Проверяет код; верный или истёкший код удаляется."""
+        codes = ConfirmationCode.objects.filter(user=user)
+        entry = codes.first()
+        if entry is None:
+            return False
+        if is_expired(entry.created_at):
+            codes.delete()
+            return False
+        if constant_time_compare(
+                make_code_hash(user, code, entry.created_at),
+                entry.code_hash):
+            codes.delete()
+            return True
+        codes.update(attempts=F('attempts') + 1)
+        codes.filter(
+            attempts__gte=settings.CONFIRMATION_CODE_MAX_ATTEMPTS).delete()
+        return False
+
+
+class CacheCodeStore:
+    """Коды в кэше Django с истечением по TTL.
+
+    Если кэш недоступен, код выдаётся через базу, а проверка кода, которого
+    нет в кэше, обращается к базе.
+    """
+
+    fallback_class = DatabaseCodeStore
+
+    def __init__(self):
+        self.fallback = self.fallback_class()
+
+    @property
+    def cache(self):
+        return caches[settings.CONFIRMATION_CODE_CACHE_ALIAS]
+
+    def get_keys(self, user):
+        return (f'confirmation-codes:{user.pk}',
+                f'confirmation-codes:{user.pk}:attempts')
+
+    def issue(self, user, code):
+        code_key, attempts_key = self.get_keys(user)
+        created_at = timezone.now()
+        try:
+            self.cache.set_many({
+                code_key: {
+                    'hash': make_code_hash(user, code, created_at),
+                    'created_at': created_at,
+                },
+                attempts_key: 0,
+            }, settings.CONFIRMATION_CODE_TTL.total_seconds())
+        except Exception:
+            logger.warning('Кэш кодов подтверждения недоступен, код '
+                           'сохраняется в базе', exc_info=True)
+            self.fallback.issue(user, code)
+
+    def check(self, user, code):
+        """Проверяет код; верный или истёкший код удаляется."""
+        keys = self.get_keys(user)
+        code_key, attempts_key = keys
+        try:
+            entry = self.cache.get(code_key)
+        except Exception:
+            logger.warning('Кэш кодов подтверждения недоступен',
+                           exc_info=True)
+            entry = None
+        if entry is None:
+            return self.fallback.check(user, code)
+        if is_expired(entry['created_at']):
+            self.cache.delete_many(keys)
+            return False
+        if constant_time_compare(
+                make_code_hash(user, code, entry['created_at']),
+                entry['hash']):
+            self.cache.delete_many(keys)
+            return True
+        try:
+            attempts = self.cache.incr(attempts_key)
+        except ValueError:
+            attempts = settings.CONFIRMATION_CODE_MAX_ATTEMPTS
+        if attempts >= settings.CONFIRMATION_CODE_MAX_ATTEMPTS:
+            self.cache.delete_many(keys)
+        return False
+
+
+@lru_cache(maxsize=None)
+def load_code_store(path):
+    return import_string(path)()
+
+
+def get_code_store():
+    return load_code_store(settings.CONFIRMATION_CODE_STORE)
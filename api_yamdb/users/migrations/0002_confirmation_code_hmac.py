@@ -0,0 +1,28 @@
+# Generated by Django 3.2 on 2026-10-18 05:20
+
+from django.db import migrations, models
+
+
+def clear_confirmation_codes(apps, schema_editor):
+    # Старые коды хранились хешем пароля со временем в нечитаемом формате
+    # и не проверяются новой схемой: пользователи запросят код заново.
+    User = apps.get_model('users', 'User')
+    User.objects.update(
+        confirmation_code_hash=None, confirmation_code_created_at=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            clear_confirmation_codes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='user',
+            name='confirmation_code_created_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Время создания кода подтверждения'),
+        ),
+    ]
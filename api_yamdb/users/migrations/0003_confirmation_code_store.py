@@ -0,0 +1,35 @@
+# Generated by Django 3.2 on 2026-10-18 05:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_confirmation_code_hmac'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConfirmationCode',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='confirmation_code', serialize=False, to='users.user', verbose_name='Пользователь')),
+                ('code_hash', models.CharField(max_length=128, verbose_name='Код подтверждения')),
+                ('created_at', models.DateTimeField(verbose_name='Время создания кода подтверждения')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Неудачные попытки')),
+            ],
+            options={
+                'verbose_name': 'Код подтверждения',
+                'verbose_name_plural': 'Коды подтверждения',
+            },
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='confirmation_code_created_at',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='confirmation_code_hash',
+        ),
+    ]
@@ -1,14 +1,13 @@
-from django.contrib.auth.hashers import check_password, make_password
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 from django.db import models
-from django.utils import timezone
 
 from api import constants
 from api.validators import validate_username
+from reviews.deletion import DeletionScopeMixin
 
 
-class User(AbstractUser):
+class User(DeletionScopeMixin, AbstractUser):
     username = models.CharField(
         'Имя пользователя',
         max_length=constants.USERNAME_LENGTH,
@@ -29,19 +28,44 @@ class User(AbstractUser):
         default=constants.USER,
     )
     bio = models.TextField('Биография', blank=True)
-    confirmation_code_hash = models.CharField(
-        'Код подтверждения',
-        max_length=constants.CONFIRMATION_CODE_LENGTH,
-        blank=True,
-        null=True)
-    confirmation_code_created_at = models.TextField(
-        'Время создания кода подтверждения',
-        blank=True,
-        null=True)
+    token_version = models.PositiveIntegerField(
+        'Версия токенов',
+        default=0,
+        editable=False,
+    )
+
+    # Поля, копии которых хранятся в токене доступа: их изменение
+    # увеличивает `token_version` и отзывает выданные токены.
+    TOKEN_CLAIM_FIELDS = ('role', 'is_superuser', 'is_active')
 
     def __str__(self):
         return self.username[:constants.USERNAME_LENGTH]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_values', {})
+        changed = [
+            field for field in self.TOKEN_CLAIM_FIELDS
+            if field in loaded and loaded[field] != getattr(self, field)
+        ]
+        if changed:
+            self.token_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {
+                    *kwargs['update_fields'], 'token_version'}
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'username' in update_fields:
+            changed.append('username')
+        for field in changed:
+            if field in loaded:
+                loaded[field] = getattr(self, field)
+
     @property
     def is_admin(self):
         return self.role == constants.ADMIN or self.is_superuser
@@ -50,14 +74,28 @@ class User(AbstractUser):
     def is_moderator(self):
         return self.role == constants.MODERATOR
 
-    def set_confirmation_code(self, code):
-        """Устанавливает хешированный код подтверждения и время создания."""
-        self.confirmation_code_hash = make_password(code)
-        self.confirmation_code_created_at = timezone.now().strftime(
-            '%d-%m-%dY %H:%M:%S'
-        )
-        self.save()
-
-    def is_confirmation_code_valid(self, code):
-        """Проверяет, совпадает ли код."""
-        return check_password(code, self.confirmation_code_hash)
+
+class ConfirmationCode(models.Model):
+    """Код подтверждения в базе, если кэш для кодов недоступен."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='confirmation_code',
+        verbose_name='Пользователь',
+    )
+    code_hash = models.CharField(
+        'Код подтверждения',
+        max_length=constants.CONFIRMATION_CODE_LENGTH)
+    created_at = models.DateTimeField('Время создания кода подтверждения')
+    attempts = models.PositiveSmallIntegerField(
+        'Неудачные попытки',
+        default=0)
+
+    class Meta:
+        verbose_name = 'Код подтверждения'
+        verbose_name_plural = 'Коды подтверждения'
+
+    def __str__(self):
+        return f'{self.user_id}: {self.created_at}'
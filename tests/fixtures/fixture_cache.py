@@ -0,0 +1,14 @@
+import pytest
+from django.core.cache import caches
+
+from api.authentication import user_cache
+from api.throttling import buckets
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    yield
+    for cache in caches.all():
+        cache.clear()
+    user_cache.clear()
+    buckets.clear()
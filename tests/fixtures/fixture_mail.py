@@ -0,0 +1,6 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def eager_mail(settings):
+    settings.MAIL_DISPATCH_EAGER = True
@@ -1,7 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
+from threading import Barrier
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.db.utils import IntegrityError
+from rest_framework.test import APIClient
+
+from reviews.models import Comment, Review, Title
 
 from tests.utils import (check_fields, check_pagination, create_reviews,
                          create_single_review, create_titles)
@@ -411,3 +418,101 @@ class Test05ReviewAPI:
             f'Проверьте, что PUT-запрос к `{self.REVIEW_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_07_review_post_concurrent(self, admin_client, user):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        posts = 8
+        barrier = Barrier(posts)
+
+        def post_review(idx):
+            client = APIClient()
+            client.force_authenticate(user)
+            barrier.wait()
+            try:
+                return client.post(
+                    url, data={'text': f'Отзыв {idx}', 'score': 5}
+                ).status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=posts) as executor:
+            statuses = sorted(executor.map(post_review, range(posts)))
+        assert statuses == (
+            [HTTPStatus.CREATED] + [HTTPStatus.BAD_REQUEST] * (posts - 1)
+        ), (
+            'Проверьте, что из одновременных POST-запросов одного '
+            f'пользователя к `{self.REVIEWS_URL_TEMPLATE}` успешен ровно '
+            'один, а остальные возвращают ответ со статусом 400.'
+        )
+        assert Review.objects.filter(
+            author=user, title_id=titles[0]['id']
+        ).count() == 1
+
+    def test_08_reviews_expand_comments(self, client, admin_client, admin,
+                                        user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        first, second = (review['id'] for review in reviews)
+        for idx in range(4):
+            Comment.objects.create(
+                review_id=first, author=[admin, user][idx % 2],
+                text=f'Комментарий {idx}'
+            )
+        Comment.objects.create(
+            review_id=second, author=admin, text='Единственный'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{url}?expand=comments&comments_limit=2')
+        assert response.status_code == HTTPStatus.OK
+        embedded = {
+            review['id']: [
+                (comment['text'], comment['author'])
+                for comment in review.get('comments', [])
+            ]
+            for review in response.json()['results']
+        }
+        assert embedded == {
+            first: [('Комментарий 3', user.username),
+                    ('Комментарий 2', admin.username)],
+            second: [('Единственный', admin.username)],
+        }, (
+            f'Проверьте, что GET-запрос к `{self.REVIEWS_URL_TEMPLATE}` с '
+            'параметром `expand=comments` встраивает в каждый отзыв не '
+            'более `comments_limit` последних комментариев.'
+        )
+        assert len(context.captured_queries) <= 4, (
+            'Проверьте, что последние комментарии всех отзывов страницы '
+            'загружаются одним запросом вместе с авторами.'
+        )
+
+        response = client.get(url)
+        assert 'comments' not in response.json()['results'][0], (
+            'Проверьте, что комментарии встраиваются в отзывы только по '
+            'запросу `expand=comments`.'
+        )
+        response = client.get(f'{url}?expand=comments&comments_limit=0')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что некорректный `comments_limit` возвращает ответ '
+            'со статусом 400.'
+        )
+
+    def test_09_stale_title_save_keeps_aggregates(self, admin_client, admin,
+                                                  user):
+        titles, _, _ = create_titles(admin_client)
+        stale = Title.objects.get(pk=titles[0]['id'])
+        Review.objects.create(
+            title=stale, author=admin, text='Отзыв', score=4)
+        Review.objects.create(
+            title=stale, author=user, text='Отзыв', score=8)
+        stale.description = 'Новое описание'
+        stale.save()
+        title = Title.objects.get(pk=stale.pk)
+        assert (title.reviews_count, title.score_sum, title.rating,
+                title.description) == (2, 12, 6, 'Новое описание'), (
+            'Проверьте, что сохранение загруженного ранее произведения не '
+            'затирает количество отзывов и рейтинг.'
+        )
@@ -1,7 +1,9 @@
 from http import HTTPStatus
 
 import pytest
+from django.core.management import call_command
 
+from reviews.models import Comment, Review
 from tests.utils import (check_fields, check_pagination, create_comments,
                          create_reviews, create_single_comment)
 
@@ -366,3 +368,56 @@ class Test06CommentAPI:
             f'Проверьте, что PUT-запрос к `{self.COMMENT_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_08_review_comments_count(self, client, admin_client, admin,
+                                      user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        def get_counts():
+            response = client.get(reviews_url)
+            assert response.status_code == HTTPStatus.OK
+            return {
+                review['id']: review.get('comments_count')
+                for review in response.json()['results']
+            }
+
+        assert get_counts() == {reviews[0]['id']: 2, reviews[1]['id']: 0}, (
+            f'Проверьте, что отзывы в ответе на GET-запрос к `{reviews_url}` '
+            'содержат поле `comments_count` с количеством комментариев.'
+        )
+
+        response = user_client.delete(
+            self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id'],
+                comment_id=comments[1]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        create_single_comment(
+            admin_client, titles[0]['id'], reviews[1]['id'], 'Согласен'
+        )
+        expected = {reviews[0]['id']: 1, reviews[1]['id']: 1}
+        assert get_counts() == expected, (
+            'Проверьте, что `comments_count` обновляется при добавлении и '
+            'удалении комментариев.'
+        )
+
+        Review.objects.update(comments_count=0)
+        call_command('recompute_comments_counts')
+        assert get_counts() == expected
+
+    def test_09_stale_review_save_keeps_comments_count(self, admin_client,
+                                                       admin, user_client,
+                                                       user):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, _ = create_comments(admin_client, author_map)
+        stale = Review.objects.get(pk=reviews[1]['id'])
+        Comment.objects.create(review=stale, author=admin, text='Согласен')
+        stale.text = 'Новый текст'
+        stale.save()
+        assert Review.objects.get(pk=stale.pk).comments_count == 1, (
+            'Проверьте, что сохранение загруженного ранее отзыва не '
+            'затирает количество комментариев.'
+        )
@@ -0,0 +1,294 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Genre, Review, Title
+from tests.utils import (count_queries, create_reviews, create_single_comment,
+                         create_single_review, create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08Queries:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_titles_list_queries(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        small_page_queries = count_queries(client, self.TITLES_URL)
+
+        genres = list(Genre.objects.all())
+        category = Title.objects.get(pk=titles[0]['id']).category
+        for idx in range(10):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            )
+            title.genre.set(genres)
+        full_page_queries = count_queries(client, self.TITLES_URL)
+
+        assert full_page_queries == small_page_queries, (
+            f'Проверьте, что количество запросов к базе данных при GET-запросе '
+            f'к `{self.TITLES_URL}` не зависит от количества произведений на '
+            'странице. Используйте `select_related` и `prefetch_related`.'
+        )
+        assert full_page_queries <= 3, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` выполняет не '
+            'более трёх запросов к базе данных.'
+        )
+
+    def test_02_title_detail_queries(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        assert count_queries(client, url) <= 2, (
+            'Проверьте, что GET-запрос к '
+            f'`{self.TITLES_DETAIL_URL_TEMPLATE}` выполняет не более двух '
+            'запросов к базе данных.'
+        )
+
+    def test_03_titles_cache(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        count_queries(client, self.TITLES_URL)
+        count_queries(client, url)
+        assert count_queries(client, self.TITLES_URL) == 0, (
+            f'Проверьте, что повторный GET-запрос к `{self.TITLES_URL}` '
+            'обслуживается из кэша без запросов к базе данных.'
+        )
+        assert count_queries(client, url) == 0, (
+            'Проверьте, что повторный GET-запрос к '
+            f'`{self.TITLES_DETAIL_URL_TEMPLATE}` обслуживается из кэша без '
+            'запросов к базе данных.'
+        )
+
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 8)
+        assert client.get(url).json()['rating'] == 8, (
+            'Проверьте, что создание отзыва сбрасывает кэш карточки '
+            'произведения.'
+        )
+        results = client.get(self.TITLES_URL).json()['results']
+        assert {title['id']: title['rating'] for title in results} == {
+            titles[0]['id']: 8, titles[1]['id']: None
+        }, (
+            'Проверьте, что создание отзыва сбрасывает кэш списка '
+            'произведений.'
+        )
+
+        admin_client.patch(url, data={'name': 'Терминатор 2'})
+        assert client.get(url).json()['name'] == 'Терминатор 2', (
+            'Проверьте, что изменение произведения сбрасывает его кэш.'
+        )
+
+    def test_04_conditional_get(self, client, admin_client, admin, user,
+                                user_client):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        urls = (
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            self.TITLES_URL,
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}'
+            '/comments/',
+        )
+        for url in urls:
+            etag = client.get(url).get('ETag')
+            assert etag, (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовок `ETag`.'
+            )
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                '`If-None-Match` возвращает ответ со статусом 304.'
+            )
+            assert not context.captured_queries, (
+                f'Проверьте, что ответ 304 на GET-запрос к `{url}` '
+                'формируется без запросов к базе данных.'
+            )
+
+        comments_url = urls[-1]
+        etag = client.get(comments_url)['ETag']
+        create_single_comment(
+            user_client, titles[0]['id'], reviews[0]['id'], 'Согласен'
+        )
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после добавления комментария GET-запрос к '
+            f'`{comments_url}` со старым `If-None-Match` возвращает '
+            'ответ со статусом 200.'
+        )
+
+    def test_05_reviews_and_comments_list_queries(self, client, admin,
+                                                  admin_client, user,
+                                                  user_client,
+                                                  django_user_model):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        review_id = reviews[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{review_id}/comments/'
+        create_single_comment(user_client, title_id, review_id, 'Согласен')
+        small_page_queries = (
+            count_queries(client, reviews_url),
+            count_queries(client, comments_url),
+        )
+
+        for idx in range(5):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                author=author, title_id=title_id, text='Отзыв', score=5
+            )
+            Comment.objects.create(
+                author=author, review_id=review_id, text='Комментарий'
+            )
+        full_page_queries = (
+            count_queries(client, reviews_url),
+            count_queries(client, comments_url),
+        )
+        assert full_page_queries == small_page_queries, (
+            'Проверьте, что количество запросов к базе данных при '
+            'получении списка отзывов и комментариев не зависит от '
+            'количества записей на странице. Используйте `select_related`.'
+        )
+        assert max(full_page_queries) <= 3, (
+            'Проверьте, что GET-запрос к списку отзывов или комментариев '
+            'выполняет не более трёх запросов к базе данных.'
+        )
+
+    def test_06_versions_expire(self, client, admin_client, settings):
+        settings.TITLES_CACHE_TIMEOUT = 1
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        etag = client.get(url)['ETag']
+        # Изменение в обход сигналов, как из процесса с другим кэшем.
+        Title.objects.filter(pk=titles[0]['id']).update(name='Новое')
+        time.sleep(1.1)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что версии данных в кэше ответов имеют конечный '
+            'таймаут и не отдают устаревший ответ бесконечно.'
+        )
+        assert response.json()['name'] == 'Новое'
+
+    def create_discussion(self, title_id, authors, comments_per_review):
+        for author in authors:
+            review = Review.objects.create(
+                title_id=title_id, author=author, text='Отзыв', score=5)
+            Comment.objects.bulk_create([
+                Comment(review=review, author=author, text='Комментарий')
+                for _ in range(comments_per_review)
+            ])
+        Review.objects.recompute_comments_counts()
+
+    def test_07_cascade_delete_queries(self, admin_client, django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        authors = [
+            django_user_model.objects.create(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake')
+            for idx in range(15)
+        ]
+        Title.objects.get(pk=titles[1]['id']).genre.set(
+            Title.objects.get(pk=titles[0]['id']).genre.all())
+        self.create_discussion(titles[0]['id'], authors[:3], 3)
+        self.create_discussion(titles[1]['id'], authors, 3)
+        deletes = []
+        for title in titles[:2]:
+            url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title['id'])
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.delete(url)
+            assert response.status_code == HTTPStatus.NO_CONTENT
+            deletes.append(len(context.captured_queries))
+        assert deletes[0] == deletes[1], (
+            'Проверьте, что удаление произведения не выполняет запросы для '
+            'каждого отзыва и комментария.'
+        )
+
+    def test_08_user_delete_queries(self, admin_client, client, admin,
+                                    django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        review = Review.objects.create(
+            title_id=titles[0]['id'], author=admin, text='Отзыв', score=5)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        selects = []
+        for count in (2, 10):
+            author = django_user_model.objects.create(
+                username=f'author{count}', email=f'author{count}@yamdb.fake')
+            for _ in range(count):
+                Comment.objects.create(
+                    review=review, author=author, text='Комментарий')
+            assert client.get(reviews_url).json()['results'][0][
+                'comments_count'] == count
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.delete(
+                    f'/api/v1/users/{author.username}/')
+            assert response.status_code == HTTPStatus.NO_CONTENT
+            selects.append(sum(
+                query['sql'].startswith('SELECT')
+                for query in context.captured_queries
+            ))
+            assert client.get(reviews_url).json()['results'][0][
+                'comments_count'] == 0, (
+                'Проверьте, что удаление пользователя сбрасывает кэш списка '
+                'отзывов с его комментариями.'
+            )
+        assert selects[0] == selects[1], (
+            'Проверьте, что удаление пользователя не читает отзыв для '
+            'каждого его комментария.'
+        )
+
+    def test_09_users_version(self, client, admin_client, admin):
+        titles, _, _ = create_titles(admin_client)
+        Review.objects.create(
+            title_id=titles[0]['id'], author=admin, text='Отзыв', score=5)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(url)['ETag']
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'newcomer', 'email': 'newcomer@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        admin_client.patch('/api/v1/users/me/', data={'bio': 'Новое'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что регистрация и правка профиля не сбрасывают '
+            'ETag списков отзывов и комментариев.'
+        )
+        admin_client.patch('/api/v1/users/me/', data={'username': 'renamed'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена username сбрасывает ETag списков отзывов '
+            'и комментариев.'
+        )
+        assert response.json()['results'][0]['author'] == 'renamed'
+
+    def test_10_failed_delete_forgets_marks(self, admin_client, admin):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        review = Review.objects.create(
+            title=title, author=admin, text='Отзыв', score=5)
+
+        def fail(**kwargs):
+            raise RuntimeError
+
+        post_delete.connect(fail, sender=Review)
+        try:
+            with pytest.raises(RuntimeError):
+                title.delete()
+        finally:
+            post_delete.disconnect(fail, sender=Review)
+        review.delete()
+        assert Title.objects.get(pk=title.pk).reviews_count == 0, (
+            'Проверьте, что прерванное ошибкой удаление произведения не '
+            'мешает обновлять его рейтинг после удаления отзыва.'
+        )
@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_search_by_name_and_description(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+
+        response = client.get(f'{self.TITLES_URL}?search=терминат')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с параметром '
+            '`search` возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [
+            titles[0]['id']
+        ], (
+            f'Проверьте, что поиск `{self.TITLES_URL}?search=` находит '
+            'произведения по началу слова в названии.'
+        )
+
+        response = client.get(f'{self.TITLES_URL}?search=yippie')
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[1]['id']
+        ], (
+            f'Проверьте, что поиск `{self.TITLES_URL}?search=` находит '
+            'произведения по описанию.'
+        )
+
+    def test_02_search_index_follows_title_changes(self, client,
+                                                   admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}?search=Чужой'
+
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/', data={'name': 'Чужой'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert client.get(url).json()['count'] == 1, (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+
+        Title.objects.filter(pk=titles[0]['id']).delete()
+        assert client.get(url).json()['count'] == 0, (
+            'Проверьте, что поисковый индекс обновляется при удалении '
+            'произведения.'
+        )
+
+    def test_03_search_ranks_by_relevance(self, client, admin_client):
+        create_titles(admin_client)
+        Title.objects.create(
+            name='Ночь', year=2001,
+            description='Про реку и ещё раз про реку, реку, реку.'
+        )
+        Title.objects.create(
+            name='Альфа', year=2002, description='Немного про реку.'
+        )
+        response = client.get(f'{self.TITLES_URL}?search=реку')
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Ночь', 'Альфа'], (
+            f'Проверьте, что результаты поиска `{self.TITLES_URL}?search=` '
+            'отсортированы по релевантности.'
+        )
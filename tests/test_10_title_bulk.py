@@ -0,0 +1,152 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Genre, Title
+from tests.utils import create_categories, create_genre, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleBulkAPI:
+
+    BULK_URL = '/api/v1/titles/bulk/'
+
+    def test_01_bulk_not_admin(self, client, user_client):
+        data = [{'name': 'Тест', 'year': 2000, 'genre': [], 'category': 'x'}]
+        response = client.post(
+            self.BULK_URL, data=data, content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что POST-запрос неавторизованного пользователя к '
+            f'`{self.BULK_URL}` возвращает ответ со статусом 401.'
+        )
+        response = user_client.post(self.BULK_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что POST-запрос пользователя с ролью `user` к '
+            f'`{self.BULK_URL}` возвращает ответ со статусом 403.'
+        )
+
+    def test_02_bulk_create(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = [
+            {
+                'name': f'Произведение {idx}',
+                'year': 2000 + idx,
+                'genre': [genres[0]['slug'], genres[idx % 2 + 1]['slug']],
+                'category': categories[idx % 2]['slug'],
+                'description': 'Описание',
+            }
+            for idx in range(20)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                self.BULK_URL, data=data, format='json'
+            )
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Если POST-запрос администратора к `{self.BULK_URL}` содержит '
+            'корректные данные - должен вернуться ответ со статусом 201.'
+        )
+        assert len(context.captured_queries) < 20, (
+            f'Проверьте, что POST-запрос к `{self.BULK_URL}` создаёт '
+            'произведения пакетно, а не по одному.'
+        )
+        results = response.json()
+        assert [title['name'] for title in results] == [
+            item['name'] for item in data
+        ], (
+            f'Проверьте, что ответ на POST-запрос к `{self.BULK_URL}` '
+            'содержит созданные произведения в порядке запроса.'
+        )
+        assert results[3]['category'] == categories[1]
+        assert {genre['slug'] for genre in results[3]['genre']} == {
+            genres[0]['slug'], genres[2]['slug']
+        }
+        assert Title.objects.count() == len(data)
+
+    def test_03_bulk_update_and_errors(self, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        data = [
+            {
+                'id': titles[0]['id'],
+                'name': 'Терминатор 2',
+                'year': 1991,
+                'genre': [genres[2]['slug']],
+                'category': categories[1]['slug'],
+            },
+            {
+                'name': 'Новое произведение',
+                'year': 2020,
+                'genre': ['unknown'],
+                'category': categories[0]['slug'],
+            },
+        ]
+        response = admin_client.post(self.BULK_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Если POST-запрос администратора к `{self.BULK_URL}` содержит '
+            'некорректные данные - должен вернуться ответ со статусом 400.'
+        )
+        errors = response.json()
+        assert errors[0] == {} and 'genre' in errors[1], (
+            f'Проверьте, что ошибки POST-запроса к `{self.BULK_URL}` '
+            'возвращаются отдельно для каждого элемента.'
+        )
+        assert Title.objects.count() == len(titles)
+
+        data[1]['genre'] = [genres[0]['slug']]
+        response = admin_client.post(self.BULK_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.name == 'Терминатор 2' and title.year == 1991
+        assert list(title.genre.values_list('slug', flat=True)) == [
+            genres[2]['slug']
+        ]
+        detail = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert detail.json()['name'] == 'Терминатор 2', (
+            'Проверьте, что пакетное изменение сбрасывает кэш произведений.'
+        )
+
+    def test_04_bulk_update_queries(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = [
+            {
+                'name': f'Произведение {idx}',
+                'year': 2000,
+                'genre': [genres[0]['slug'], genres[1]['slug']],
+                'category': categories[0]['slug'],
+            }
+            for idx in range(20)
+        ]
+        response = admin_client.post(self.BULK_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        for item, title in zip(data, response.json()):
+            item['id'] = title['id']
+            item['genre'] = [genres[2]['slug']]
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                self.BULK_URL, data=data, format='json'
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(context.captured_queries) < 20, (
+            f'Проверьте, что POST-запрос к `{self.BULK_URL}` изменяет '
+            'произведения и их жанры пакетно, а не по одному.'
+        )
+        assert dict(Genre.objects.values_list('slug', 'titles_count')) == {
+            genres[0]['slug']: 0,
+            genres[1]['slug']: 0,
+            genres[2]['slug']: len(data),
+        }, (
+            'Проверьте, что пакетное изменение жанров обновляет счётчики '
+            'произведений по жанрам.'
+        )
+
+        Title.objects.get(pk=data[0]['id']).genre.clear()
+        assert Genre.objects.get(slug=genres[2]['slug']).titles_count == (
+            len(data) - 1
+        ), (
+            'Проверьте, что после пакетной записи удаление связи с жанром '
+            'снова обновляет счётчик жанра.'
+        )
@@ -0,0 +1,78 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from urllib.parse import urlencode
+
+from reviews.models import Review
+from tests.utils import create_comments
+
+FULL_SCAN_PATTERN = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+
+
+def get_full_scans(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        if response.streaming:
+            b''.join(response.streaming_content)
+    scans = []
+    with connection.cursor() as cursor:
+        for query in context.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+            for row in cursor.fetchall():
+                match = FULL_SCAN_PATTERN.match(row[-1])
+                if match:
+                    scans.append((match.group(1), query['sql']))
+    return scans
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite',
+                    reason='EXPLAIN QUERY PLAN есть только в SQLite')
+@pytest.mark.django_db(transaction=True)
+class Test11QueryPlans:
+
+    def test_01_no_full_table_scans(self, client, admin_client, admin,
+                                    user, user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title = titles[0]
+        urls = (
+            f'/api/v1/titles/?year={title["year"]}',
+            f'/api/v1/titles/?genre={title["genre"][0]}',
+            f'/api/v1/titles/?category={title["category"]}',
+            f'/api/v1/titles/{title["id"]}/reviews/',
+            f'/api/v1/titles/{title["id"]}/reviews/{reviews[0]["id"]}'
+            '/comments/',
+            f'/api/v1/users/{user.username}/reviews/',
+            f'/api/v1/users/{user.username}/comments/',
+        )
+        for url in urls:
+            scans = get_full_scans(client, url)
+            assert not scans, (
+                f'Проверьте, что GET-запрос к `{url}` использует индексы. '
+                f'Полный просмотр таблиц: {scans}'
+            )
+
+    def test_02_export_since_uses_index(self, admin_client, admin, user,
+                                        user_client):
+        create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        since = Review.objects.order_by('pub_date').last().pub_date
+        url = ('/api/v1/export/reviews/?'
+               f'{urlencode({"since": since.isoformat()})}')
+        scans = get_full_scans(admin_client, url)
+        assert not scans, (
+            f'Проверьте, что GET-запрос к `{url}` с параметром `since` '
+            f'использует индексы. Полный просмотр таблиц: {scans}'
+        )
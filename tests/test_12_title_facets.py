@@ -0,0 +1,134 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title, TitleYearCount
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleFacetsAPI:
+
+    FACETS_URL = '/api/v1/titles/facets/'
+
+    def get_facets(self, client, query=''):
+        response = client.get(f'{self.FACETS_URL}{query}')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.FACETS_URL}` возвращает '
+            'ответ со статусом 200.'
+        )
+        data = response.json()
+        return (
+            {item['slug']: item['count'] for item in data['genre']},
+            {item['slug']: item['count'] for item in data['category']},
+            {item['year']: item['count'] for item in data['year']},
+        )
+
+    def test_01_facets_follow_title_changes(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        assert self.get_facets(client) == (
+            {'horror': 1, 'comedy': 1, 'drama': 1},
+            {'films': 1, 'books': 1},
+            {1984: 1, 1988: 1},
+        ), (
+            f'Проверьте, что `{self.FACETS_URL}` возвращает количество '
+            'произведений по жанрам, категориям и годам.'
+        )
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/',
+            data={'category': 'films', 'year': 1984, 'genre': ['horror']}
+        )
+        assert self.get_facets(client) == (
+            {'horror': 2, 'comedy': 1},
+            {'films': 2},
+            {1984: 2},
+        ), (
+            f'Проверьте, что `{self.FACETS_URL}` учитывает изменение '
+            'произведения.'
+        )
+
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert self.get_facets(client) == (
+            {'horror': 1}, {'films': 1}, {1984: 1}
+        ), (
+            f'Проверьте, что `{self.FACETS_URL}` учитывает удаление '
+            'произведения.'
+        )
+
+        admin_client.post('/api/v1/titles/bulk/', data=[
+            {'name': 'Пакет', 'year': 1999, 'genre': ['drama', 'horror'],
+             'category': 'books'},
+            {'id': titles[1]['id'], 'name': 'Крепкий орешек', 'year': 1988,
+             'genre': ['comedy'], 'category': 'books'},
+        ], format='json')
+        expected = (
+            {'horror': 1, 'drama': 1, 'comedy': 1},
+            {'books': 2},
+            {1988: 1, 1999: 1},
+        )
+        assert self.get_facets(client) == expected, (
+            f'Проверьте, что `{self.FACETS_URL}` учитывает пакетную '
+            'загрузку произведений.'
+        )
+
+        Category.objects.update(titles_count=0)
+        Genre.objects.update(titles_count=0)
+        TitleYearCount.objects.all().delete()
+        call_command('recompute_facets')
+        assert self.get_facets(client) == expected
+
+    def test_02_filtered_facets(self, client, admin_client):
+        create_titles(admin_client)
+        Title.objects.create(
+            name='Чужие', year=1986, category=Category.objects.get(
+                slug='films')
+        ).genre.set(Genre.objects.filter(slug__in=['horror', 'drama']))
+
+        assert self.get_facets(client, '?genre=horror') == (
+            {'horror': 2, 'comedy': 1, 'drama': 1},
+            {'films': 2},
+            {1984: 1, 1986: 1},
+        ), (
+            f'Проверьте, что `{self.FACETS_URL}` учитывает параметры '
+            'фильтрации произведений.'
+        )
+        assert self.get_facets(client, '?category=films&year=1986') == (
+            {'horror': 1, 'drama': 1}, {'films': 1}, {1986: 1}
+        )
+
+    def test_03_stale_category_save_keeps_count(self, admin_client):
+        titles, categories, _ = create_titles(admin_client)
+        stale = Category.objects.get(slug=categories[0]['slug'])
+        expected = stale.titles_count
+        Title.objects.create(name='Новое', year=2000, category=stale)
+        stale.name = 'Новое название'
+        stale.save()
+        assert Category.objects.get(pk=stale.pk).titles_count == (
+            expected + 1
+        ), (
+            'Проверьте, что сохранение загруженной ранее категории не '
+            'затирает количество произведений.'
+        )
+
+    def test_04_deferred_title_save(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.only('name').get(pk=titles[1]['id'])
+        title.year = 1984
+        title.category = Category.objects.get(slug='films')
+        with CaptureQueriesContext(connection) as context:
+            title.save()
+        assert not any(
+            query['sql'].startswith('UPDATE') and 'WHERE' not in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что сохранение произведения без загруженных '
+            'категории и года не пересчитывает все счётчики.'
+        )
+        assert self.get_facets(client)[1:] == ({'films': 2}, {1984: 2}), (
+            'Проверьте, что сохранение произведения без загруженных '
+            'категории и года обновляет счётчики.'
+        )
@@ -0,0 +1,76 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import LeaderboardEntry, Review
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleTopAPI:
+
+    TOP_URL = '/api/v1/titles/top/'
+
+    def get_top(self, client, query=''):
+        response = client.get(f'{self.TOP_URL}{query}')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TOP_URL}` возвращает ответ '
+            'со статусом 200.'
+        )
+        return [title['id'] for title in response.json()]
+
+    def test_01_top_titles(self, client, admin_client, user_client,
+                           moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        assert self.get_top(client) == [], (
+            f'Проверьте, что `{self.TOP_URL}` не содержит произведений без '
+            'отзывов.'
+        )
+
+        create_single_review(user_client, first, 'Хорошо', 7)
+        create_single_review(moderator_client, first, 'Неплохо', 8)
+        create_single_review(user_client, second, 'Отлично', 10)
+        assert self.get_top(client) == [second, first], (
+            f'Проверьте, что `{self.TOP_URL}` сортирует произведения по '
+            'средней оценке.'
+        )
+        assert self.get_top(client, '?min_reviews=2') == [first], (
+            f'Проверьте, что `{self.TOP_URL}` учитывает параметр '
+            '`min_reviews`.'
+        )
+        assert self.get_top(client, '?genre=horror') == [first]
+        assert self.get_top(client, '?category=books') == [second]
+        assert self.get_top(client, '?year=1984&genre=comedy') == [first]
+        assert self.get_top(client, '?limit=1') == [second]
+
+        review = Review.objects.get(title_id=second)
+        review.score = 1
+        review.save()
+        assert self.get_top(client) == [first, second], (
+            f'Проверьте, что `{self.TOP_URL}` обновляется при изменении '
+            'отзыва.'
+        )
+
+        admin_client.patch(
+            f'/api/v1/titles/{second}/', data={'genre': ['horror']}
+        )
+        assert self.get_top(client, '?genre=horror') == [first, second], (
+            f'Проверьте, что `{self.TOP_URL}` обновляется при изменении '
+            'жанров произведения.'
+        )
+
+        admin_client.delete(f'/api/v1/titles/{first}/')
+        assert self.get_top(client) == [second]
+
+        LeaderboardEntry.objects.all().delete()
+        call_command('refresh_leaderboard')
+        assert self.get_top(client, '?genre=horror') == [second]
+
+    def test_02_top_invalid_params(self, client):
+        response = client.get(f'{self.TOP_URL}?limit=1000')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что GET-запрос к `{self.TOP_URL}` с некорректными '
+            'параметрами возвращает ответ со статусом 400.'
+        )
@@ -0,0 +1,46 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14WeightedRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_weighted_rating(self, client, admin_client, user_client,
+                                moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        create_single_review(user_client, first, 'Хорошо', 6)
+        create_single_review(moderator_client, first, 'Отлично', 10)
+        create_single_review(user_client, second, 'Шедевр', 10)
+
+        first_url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=first)
+        second_url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=second)
+        assert 'weighted_rating' in client.get(first_url).json(), (
+            'Проверьте, что ответ на GET-запрос к '
+            f'`{self.TITLE_DETAIL_URL_TEMPLATE}` содержит поле '
+            '`weighted_rating`.'
+        )
+
+        call_command('recompute_weighted_ratings', min_votes=2)
+        global_mean = (6 + 10 + 10) / 3
+        expected = {
+            first_url: (6 + 10 + 2 * global_mean) / (2 + 2),
+            second_url: (10 + 2 * global_mean) / (1 + 2),
+        }
+        for url, rating in expected.items():
+            assert client.get(url).json()['weighted_rating'] == (
+                pytest.approx(rating)
+            ), (
+                'Проверьте, что взвешенный рейтинг учитывает общую среднюю '
+                'оценку и число отзывов произведения.'
+            )
+
+        Review.objects.filter(title_id=second).delete()
+        call_command('recompute_weighted_ratings', min_votes=2)
+        assert client.get(second_url).json()['weighted_rating'] is None
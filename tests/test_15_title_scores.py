@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, TitleScoreCount
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleScoresAPI:
+
+    SCORES_URL_TEMPLATE = '/api/v1/titles/{title_id}/scores/'
+
+    def get_scores(self, client, title_id):
+        url = self.SCORES_URL_TEMPLATE.format(title_id=title_id)
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        data = response.json()
+        assert [item['score'] for item in data['scores']] == list(
+            range(1, 11)
+        ), (
+            f'Проверьте, что `{url}` возвращает количество отзывов для '
+            'каждой оценки от 1 до 10.'
+        )
+        return data['reviews_count'], {
+            item['score']: item['count']
+            for item in data['scores'] if item['count']
+        }
+
+    def test_01_scores_follow_reviews(self, client, admin_client,
+                                      user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        assert self.get_scores(client, first) == (0, {}), (
+            'Проверьте, что у произведения без отзывов все оценки имеют '
+            'нулевое количество.'
+        )
+
+        create_single_review(user_client, first, 'Хорошо', 7)
+        create_single_review(moderator_client, first, 'Тоже хорошо', 7)
+        create_single_review(admin_client, first, 'Отлично', 10)
+        create_single_review(user_client, second, 'Плохо', 2)
+        assert self.get_scores(client, first) == (3, {7: 2, 10: 1}), (
+            'Проверьте, что распределение оценок учитывает новые отзывы.'
+        )
+        assert self.get_scores(client, second) == (1, {2: 1})
+
+        review = Review.objects.get(title_id=first, score=10)
+        review.score = 2
+        review.save()
+        assert self.get_scores(client, first) == (3, {7: 2, 2: 1}), (
+            'Проверьте, что распределение оценок учитывает изменение '
+            'отзыва.'
+        )
+
+        review.delete()
+        assert self.get_scores(client, first) == (2, {7: 2}), (
+            'Проверьте, что распределение оценок учитывает удаление '
+            'отзыва.'
+        )
+
+        TitleScoreCount.objects.all().delete()
+        call_command('recompute_score_counts')
+        assert self.get_scores(client, first) == (2, {7: 2})
+        assert self.get_scores(client, second) == (1, {2: 1})
+
+    def test_02_scores_queries(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Хорошо', 7)
+        url = self.SCORES_URL_TEMPLATE.format(title_id=title_id)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert len(context.captured_queries) <= 2, (
+            f'Проверьте, что `{url}` читает распределение из счётчиков, '
+            'а не группирует отзывы при каждом запросе.'
+        )
+
+    def test_03_scores_not_found(self, client):
+        url = self.SCORES_URL_TEMPLATE.format(title_id=100500)
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что GET-запрос к `{url}` для несуществующего '
+            'произведения возвращает ответ со статусом 404.'
+        )
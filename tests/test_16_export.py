@@ -0,0 +1,82 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+from urllib.parse import urlencode
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Review
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ExportAPI:
+
+    EXPORT_URL = '/api/v1/export/reviews/'
+
+    def read_export(self, client, query=''):
+        response = client.get(f'{self.EXPORT_URL}{query}')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос администратора к `{self.EXPORT_URL}` '
+            'возвращает ответ со статусом 200.'
+        )
+        assert response.streaming, (
+            f'Проверьте, что `{self.EXPORT_URL}` отдаёт выгрузку потоком.'
+        )
+        return [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+
+    def test_01_export(self, admin_client, admin, user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        rows = self.read_export(admin_client)
+        assert [(row['type'], row['id']) for row in rows] == [
+            *(('review', review['id']) for review in reviews),
+            *(('comment', comment['id']) for comment in comments),
+        ], (
+            f'Проверьте, что `{self.EXPORT_URL}` выгружает все отзывы, а '
+            'затем все комментарии в формате NDJSON.'
+        )
+        assert rows[0]['author'] == admin.username
+        assert rows[0]['title_id'] == titles[0]['id']
+        assert rows[-1]['review_id'] == reviews[0]['id']
+        assert rows[-1]['title_id'] == titles[0]['id']
+
+        since = Comment.objects.get(pk=comments[0]['id']).pub_date
+        rows = self.read_export(
+            admin_client, f'?{urlencode({"since": since.isoformat()})}'
+        )
+        assert [(row['type'], row['id']) for row in rows] == [
+            ('comment', comments[1]['id'])
+        ], (
+            f'Проверьте, что `{self.EXPORT_URL}` с параметром `since` '
+            'выгружает только записи, опубликованные позже.'
+        )
+
+        output = StringIO()
+        call_command('export_reviews', stdout=output)
+        lines = output.getvalue().splitlines()
+        assert len(lines) == Review.objects.count() + Comment.objects.count()
+        assert json.loads(lines[0])['id'] == reviews[0]['id']
+
+    def test_02_export_permissions(self, client, user_client):
+        assert client.get(self.EXPORT_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            f'Проверьте, что `{self.EXPORT_URL}` недоступен анонимным '
+            'пользователям.'
+        )
+        assert user_client.get(self.EXPORT_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        ), (
+            f'Проверьте, что `{self.EXPORT_URL}` доступен только '
+            'администратору.'
+        )
+
+    def test_03_export_invalid_since(self, admin_client):
+        response = admin_client.get(f'{self.EXPORT_URL}?since=вчера')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
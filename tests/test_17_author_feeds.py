@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Comment, Review, Title
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17AuthorFeedsAPI:
+
+    FEED_URL_TEMPLATE = '/api/v1/users/{username}/{feed}/'
+
+    def get_feed(self, client, username, feed, query=''):
+        url = self.FEED_URL_TEMPLATE.format(username=username, feed=feed)
+        response = client.get(f'{url}{query}')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.FEED_URL_TEMPLATE}` '
+            'возвращает ответ со статусом 200.'
+        )
+        return response.json()
+
+    def test_01_author_feeds(self, client, admin_client, admin, user,
+                             user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        second_title = Title.objects.get(pk=titles[1]['id'])
+        newest = Review.objects.create(
+            author=user, title=second_title, text='Ещё отзыв', score=3
+        )
+
+        data = self.get_feed(client, user.username, 'reviews')
+        assert [
+            (review['id'], review['title']) for review in data['results']
+        ] == [
+            (newest.pk, second_title.pk),
+            (reviews[1]['id'], titles[0]['id']),
+        ], (
+            f'Проверьте, что `{self.FEED_URL_TEMPLATE}` возвращает отзывы '
+            'пользователя по всем произведениям, новые первыми.'
+        )
+        assert 'next' in data and 'count' not in data, (
+            f'Проверьте, что `{self.FEED_URL_TEMPLATE}` использует '
+            'курсорную пагинацию.'
+        )
+        assert self.get_feed(user_client, 'me', 'reviews') == data, (
+            'Проверьте, что `/api/v1/users/me/reviews/` возвращает отзывы '
+            'текущего пользователя.'
+        )
+
+        data = self.get_feed(client, admin.username, 'comments')
+        assert [
+            (comment['id'], comment['review'], comment['title'])
+            for comment in data['results']
+        ] == [(comments[0]['id'], reviews[0]['id'], titles[0]['id'])]
+
+    def test_02_author_feed_pages(self, client, admin_client, admin, user,
+                                  user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        for idx in range(15):
+            Comment.objects.create(
+                review_id=reviews[0]['id'], author=user, text=str(idx)
+            )
+        expected = list(Comment.objects.filter(author=user).order_by(
+            '-pub_date', '-pk').values_list('pk', flat=True))
+        data = self.get_feed(client, user.username, 'comments')
+        received = [comment['id'] for comment in data['results']]
+        response = client.get(data['next'])
+        received += [comment['id'] for comment in response.json()['results']]
+        assert received == expected, (
+            f'Проверьте, что страницы `{self.FEED_URL_TEMPLATE}` по ссылке '
+            '`next` продолжают ленту без пропусков и повторов.'
+        )
+
+    def test_03_author_feed_errors(self, client):
+        url = self.FEED_URL_TEMPLATE.format(username='nobody', feed='reviews')
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что `{self.FEED_URL_TEMPLATE}` для несуществующего '
+            'пользователя возвращает ответ со статусом 404.'
+        )
+        url = self.FEED_URL_TEMPLATE.format(username='me', feed='comments')
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что `/api/v1/users/me/comments/` недоступен '
+            'анонимным пользователям.'
+        )
@@ -0,0 +1,112 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+
+from api.mail import MailDispatcher, dispatcher
+
+
+class GatedEmailBackend(EmailBackend):
+    """Почтовый бэкенд, который ждёт разрешения и может падать."""
+
+    gate = threading.Event()
+    failures = 0
+
+    def send_messages(self, messages):
+        assert self.gate.wait(5), 'Письмо не было разрешено к отправке.'
+        if GatedEmailBackend.failures:
+            GatedEmailBackend.failures -= 1
+            raise ConnectionError('SMTP недоступен')
+        return super().send_messages(messages)
+
+
+@pytest.fixture
+def gated_mail(settings):
+    settings.MAIL_DISPATCH_EAGER = False
+    settings.MAIL_RETRY_DELAY = 0
+    settings.EMAIL_BACKEND = 'tests.test_18_mail_dispatch.GatedEmailBackend'
+    GatedEmailBackend.gate.clear()
+    GatedEmailBackend.failures = 0
+    yield GatedEmailBackend
+    GatedEmailBackend.gate.set()
+    dispatcher.join()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18MailDispatch:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_does_not_wait_for_mail(self, client, gated_mail):
+        outbox_before_count = len(mail.outbox)
+        valid_data = {'email': 'valid@yamdb.fake', 'username': 'valid'}
+        response = client.post(self.URL_SIGNUP, data=valid_data)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос к `{self.URL_SIGNUP}` возвращает '
+            'ответ, не дожидаясь отправки письма.'
+        )
+        assert len(mail.outbox) == outbox_before_count
+
+        gated_mail.gate.set()
+        dispatcher.join()
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что письмо с кодом подтверждения отправляется в '
+            'фоновом потоке.'
+        )
+        assert valid_data['email'] in mail.outbox[-1].to
+
+    def test_02_mail_retries(self, gated_mail, settings):
+        settings.MAIL_RETRIES = 2
+        metrics_before = dispatcher.metrics()
+        gated_mail.failures = 2
+        gated_mail.gate.set()
+        assert dispatcher.submit(
+            subject='Тема', message='Текст', from_email='from@yamdb.fake',
+            recipient_list=['to@yamdb.fake'],
+        )
+        dispatcher.join()
+        metrics = dispatcher.metrics()
+        assert metrics['sent'] == metrics_before['sent'] + 1, (
+            'Проверьте, что письмо отправляется повторно после ошибки.'
+        )
+        assert metrics['retried'] == metrics_before['retried'] + 2
+
+        gated_mail.failures = 3
+        dispatcher.submit(
+            subject='Тема', message='Текст', from_email='from@yamdb.fake',
+            recipient_list=['to@yamdb.fake'],
+        )
+        dispatcher.join()
+        assert dispatcher.metrics()['failed'] == metrics_before['failed'] + 1
+
+    def test_03_bounded_queue(self, gated_mail, settings):
+        settings.MAIL_QUEUE_SIZE = 1
+        settings.MAIL_WORKERS = 1
+        bounded = MailDispatcher()
+        accepted = [
+            bounded.submit(
+                subject='Тема', message='Текст',
+                from_email='from@yamdb.fake', recipient_list=['to@yamdb.fake']
+            )
+            for _ in range(3)
+        ]
+        assert not all(accepted), (
+            'Проверьте, что очередь писем ограничена и переполнение '
+            'не приводит к росту очереди.'
+        )
+        assert bounded.metrics()['rejected'] == accepted.count(False)
+        gated_mail.gate.set()
+        bounded.join()
+
+    def test_04_signup_when_queue_is_full(self, client, monkeypatch):
+        monkeypatch.setattr(dispatcher, 'submit', lambda **message: False)
+        response = client.post(
+            self.URL_SIGNUP,
+            data={'email': 'valid@yamdb.fake', 'username': 'valid'}
+        )
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE, (
+            'Проверьте, что при переполненной очереди писем регистрация '
+            'возвращает ответ со статусом 503.'
+        )
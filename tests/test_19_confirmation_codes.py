@@ -0,0 +1,188 @@
+import re
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import hashers
+from django.core import mail
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import SignUpSerializer
+from users.codes import CacheCodeStore
+from users.models import ConfirmationCode
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ConfirmationCodes:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+    SIGNUP_DATA = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+
+    def signup(self, client):
+        response = client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        assert response.status_code == HTTPStatus.OK
+        return re.search(
+            r'код подтверждения: (\d+)', mail.outbox[-1].body
+        ).group(1)
+
+    def get_token(self, client, code):
+        return client.post(self.URL_TOKEN, data={
+            'username': self.SIGNUP_DATA['username'],
+            'confirmation_code': code,
+        })
+
+    def test_01_code_without_password_hasher(self, client, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError(
+                'Проверьте, что код подтверждения не хешируется '
+                'хешером паролей.'
+            )
+
+        monkeypatch.setattr(hashers.PBKDF2PasswordHasher, 'encode', fail)
+        monkeypatch.setattr(hashers.PBKDF2PasswordHasher, 'verify', fail)
+        code = self.signup(client)
+        response = self.get_token(client, code)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос к `{self.URL_TOKEN}` с кодом из '
+            'письма возвращает токен.'
+        )
+        assert 'token' in response.json()
+
+        wrong_code = str(int(code) % 90000 + 10001)
+        assert self.get_token(client, wrong_code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        )
+
+    def test_02_code_expires(self, client, settings):
+        code = self.signup(client)
+        settings.CONFIRMATION_CODE_TTL = timedelta(0)
+        response = self.get_token(client, code)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что POST-запрос к `{self.URL_TOKEN}` с истёкшим '
+            'кодом подтверждения возвращает ответ со статусом 400.'
+        )
+
+    def test_03_new_code_replaces_old(self, client):
+        old_code = self.signup(client)
+        new_code = self.signup(client)
+        if old_code != new_code:
+            assert self.get_token(client, old_code).status_code == (
+                HTTPStatus.BAD_REQUEST
+            ), (
+                'Проверьте, что после повторной регистрации старый код '
+                'подтверждения перестаёт действовать.'
+            )
+        assert self.get_token(client, new_code).status_code == HTTPStatus.OK
+
+    def test_04_signup_without_user_writes(self, client):
+        self.signup(client)
+        with CaptureQueriesContext(connection) as context:
+            code = self.signup(client)
+        writes = [
+            query['sql'] for query in context.captured_queries
+            if '"users_user"' in query['sql']
+            and not query['sql'].startswith('SELECT')
+        ]
+        assert not writes, (
+            'Проверьте, что повторная регистрация пользователя не изменяет '
+            f'таблицу пользователей: {writes}'
+        )
+        assert self.get_token(client, code).status_code == HTTPStatus.OK
+
+    def test_05_attempts_limit(self, client, settings):
+        settings.CONFIRMATION_CODE_MAX_ATTEMPTS = 2
+        code = self.signup(client)
+        wrong_code = str(int(code) % 90000 + 10001)
+        for _ in range(2):
+            assert self.get_token(client, wrong_code).status_code == (
+                HTTPStatus.BAD_REQUEST
+            )
+        assert self.get_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), (
+            'Проверьте, что код подтверждения перестаёт действовать после '
+            '`CONFIRMATION_CODE_MAX_ATTEMPTS` неудачных попыток.'
+        )
+
+    def test_06_database_store(self, client):
+        code = self.signup(client)
+        assert ConfirmationCode.objects.count() == 1
+        assert self.get_token(client, code).status_code == HTTPStatus.OK
+        assert not ConfirmationCode.objects.exists(), (
+            'Проверьте, что использованный код подтверждения удаляется.'
+        )
+        assert self.get_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        )
+
+    def test_07_cache_unavailable(self, client, monkeypatch, settings):
+        settings.CONFIRMATION_CODE_STORE = 'users.codes.CacheCodeStore'
+
+        class BrokenCache(LocMemCache):
+            def get(self, *args, **kwargs):
+                raise ConnectionError('Кэш недоступен')
+
+            set_many = get
+
+        monkeypatch.setattr(
+            CacheCodeStore, 'cache', BrokenCache('broken', {})
+        )
+        code = self.signup(client)
+        assert ConfirmationCode.objects.count() == 1, (
+            'Проверьте, что при недоступном кэше код подтверждения '
+            'сохраняется в базе.'
+        )
+        assert self.get_token(client, code).status_code == HTTPStatus.OK
+
+    def test_08_signup_queries(self, client, user):
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as context:
+                self.signup(client)
+            queries = [
+                query['sql'] for query in context.captured_queries
+                if '"users_user"' in query['sql']
+            ]
+            assert len(queries) <= 2, (
+                'Проверьте, что регистрация проверяет username и email '
+                'одним запросом и не ищет пользователя повторно при '
+                'создании.'
+            )
+        response = client.post(self.URL_SIGNUP, data={
+            'email': self.SIGNUP_DATA['email'], 'username': 'other_username'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(self.URL_SIGNUP, data={
+            'email': user.email, 'username': self.SIGNUP_DATA['username']
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что регистрация с username и email разных '
+            'пользователей возвращает ответ со статусом 400.'
+        )
+
+    def test_09_signup_in_transaction(self, client):
+        self.signup(client)
+        serializer = SignUpSerializer(data=self.SIGNUP_DATA)
+        assert serializer.is_valid()
+        # Другой запрос успел зарегистрировать пользователя после проверки.
+        serializer.user = None
+        with transaction.atomic():
+            user = serializer.save()
+            assert user.username == self.SIGNUP_DATA['username'], (
+                'Проверьте, что повторная вставка пользователя внутри '
+                'транзакции возвращает уже созданного пользователя.'
+            )
+
+    def test_10_cache_store(self, client, settings):
+        settings.CONFIRMATION_CODE_STORE = 'users.codes.CacheCodeStore'
+        code = self.signup(client)
+        assert not ConfirmationCode.objects.exists(), (
+            'Проверьте, что `CacheCodeStore` хранит код подтверждения в '
+            'кэше.'
+        )
+        assert self.get_token(client, code).status_code == HTTPStatus.OK
+        assert self.get_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        )
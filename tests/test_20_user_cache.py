@@ -0,0 +1,66 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.authentication import user_cache
+from tests.utils import count_user_queries
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20UserCache:
+
+    ME_URL = '/api/v1/users/me/'
+    USERS_URL = '/api/v1/users/'
+
+    def test_01_user_resolved_from_cache(self, user_client):
+        assert count_user_queries(user_client, self.ME_URL) == 1
+        assert count_user_queries(user_client, self.ME_URL) == 0, (
+            'Проверьте, что пользователь из JWT-токена при повторных '
+            'запросах берётся из кэша, а не из базы данных.'
+        )
+
+    def test_02_role_change_invalidates_cache(self, admin_client, user,
+                                              user_client):
+        count_user_queries(user_client, self.USERS_URL, HTTPStatus.FORBIDDEN)
+        response = admin_client.patch(
+            f'{self.USERS_URL}{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        count_user_queries(user_client, self.USERS_URL)
+
+        user.refresh_from_db()
+        user.is_active = False
+        user.save()
+        count_user_queries(user_client, self.ME_URL, HTTPStatus.UNAUTHORIZED)
+
+    def test_03_shared_cache(self, settings, user_client):
+        settings.USER_CACHE_ALIAS = 'default'
+        count_user_queries(user_client, self.ME_URL)
+        user_cache.clear()
+        assert count_user_queries(user_client, self.ME_URL) == 0, (
+            'Проверьте, что при заданном `USER_CACHE_ALIAS` пользователь '
+            'читается из общего кэша.'
+        )
+
+    def test_04_profile_change_invalidates_cache(self, user_client):
+        response = user_client.patch(self.ME_URL, data={'bio': 'Новое'})
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get(self.ME_URL).json()['bio'] == 'Новое', (
+            'Проверьте, что изменение профиля сбрасывает кэш пользователя.'
+        )
+
+    def test_05_profile_update_uses_fresh_row(self, user, user_client,
+                                              django_user_model):
+        count_user_queries(user_client, self.ME_URL)
+        # Изменение из другого процесса, не сбрасывающее кэш этого.
+        django_user_model.objects.filter(pk=user.pk).update(
+            role='moderator', token_version=1)
+        response = user_client.patch(self.ME_URL, data={'bio': 'Новое'})
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert (user.role, user.token_version, user.bio) == (
+            'moderator', 1, 'Новое'
+        ), (
+            'Проверьте, что изменение профиля через `/users/me/` не '
+            'перезаписывает поля пользователя значениями из кэша.'
+        )
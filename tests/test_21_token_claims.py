@@ -0,0 +1,99 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import get_token, user_cache
+from tests.utils import (count_user_queries, create_single_review,
+                         create_titles)
+
+
+def make_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {get_token(user).access_token}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21TokenClaims:
+
+    ME_URL = '/api/v1/users/me/'
+    USERS_URL = '/api/v1/users/'
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_token_contains_claims(self, user):
+        token = AccessToken(str(get_token(user).access_token))
+        assert (token['role'], token['token_version']) == (
+            user.role, user.token_version
+        ), (
+            'Проверьте, что токен доступа содержит роль и версию токенов '
+            'пользователя.'
+        )
+
+    def test_02_authenticated_reads_without_user_queries(self, user):
+        client = make_client(user)
+        count_user_queries(client, self.TITLES_URL)
+        user_cache.clear()
+        assert count_user_queries(client, self.TITLES_URL) == 0, (
+            'Проверьте, что права пользователя с токеном, содержащим роль, '
+            'проверяются без запросов к таблице пользователей.'
+        )
+
+    def test_03_role_change_revokes_tokens(self, admin_client, user):
+        old_client = make_client(user)
+        count_user_queries(old_client, self.USERS_URL, HTTPStatus.FORBIDDEN)
+        response = admin_client.patch(
+            f'{self.USERS_URL}{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        count_user_queries(old_client, self.USERS_URL, HTTPStatus.UNAUTHORIZED)
+
+        user.refresh_from_db()
+        new_client = make_client(user)
+        count_user_queries(new_client, self.USERS_URL)
+
+        user.bio = 'Новое'
+        user.save()
+        count_user_queries(new_client, self.USERS_URL)
+
+        user.is_active = False
+        user.save()
+        count_user_queries(new_client, self.ME_URL, HTTPStatus.UNAUTHORIZED)
+
+    def test_04_token_user_writes(self, admin_client, user):
+        client = make_client(user)
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            client, titles[0]['id'], 'Текст', 5).json()
+        assert review['author'] == user.username, (
+            'Проверьте, что отзыв пользователя с токеном, содержащим роль, '
+            'сохраняется с правильным автором.'
+        )
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{review["id"]}/')
+        response = client.patch(url, data={'text': 'Новый текст'})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что автор может изменить свой отзыв.'
+        )
+
+        response = client.patch(self.ME_URL, data={'bio': 'Новое'})
+        assert response.status_code == HTTPStatus.OK
+        data = client.get(self.ME_URL).json()
+        assert (data['email'], data['bio']) == (user.email, 'Новое'), (
+            'Проверьте, что `/users/me/` возвращает и изменяет полный '
+            'профиль пользователя.'
+        )
+
+    def test_05_username_change_keeps_token(self, user):
+        client = make_client(user)
+        response = client.patch(self.ME_URL, data={'username': 'renamed'})
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена username через `/users/me/` не отзывает '
+            'токен пользователя.'
+        )
+        assert response.json()['username'] == 'renamed'
@@ -0,0 +1,102 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from api.throttling import buckets
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22AuthThrottling:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    @pytest.fixture
+    def limits(self, settings):
+        settings.AUTH_RATE_LIMITS = {
+            'ip': (100, 60),
+            'username': (2, 60),
+            'email': (100, 60),
+        }
+        return settings.AUTH_RATE_LIMITS
+
+    def get_token(self, client, username):
+        return client.post(self.URL_TOKEN, data={
+            'username': username, 'confirmation_code': '00000'
+        })
+
+    def check_throttled(self, response, url):
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что при превышении лимита POST-запрос к `{url}` '
+            'возвращает ответ со статусом 429.'
+        )
+        assert int(response['Retry-After']) >= 1, (
+            'Проверьте, что ответ со статусом 429 содержит заголовок '
+            '`Retry-After`.'
+        )
+
+    def test_01_token_limited_by_username(self, client, user, limits):
+        for _ in range(2):
+            response = self.get_token(client, user.username)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        self.check_throttled(
+            self.get_token(client, user.username.upper()), self.URL_TOKEN)
+        assert self.get_token(client, 'other').status_code == (
+            HTTPStatus.NOT_FOUND
+        ), (
+            'Проверьте, что лимит по username не затрагивает других '
+            'пользователей.'
+        )
+
+    def test_02_signup_limited_by_ip(self, client, limits):
+        limits['ip'] = (2, 60)
+        for number in range(2):
+            response = client.post(self.URL_SIGNUP, data={
+                'username': f'user{number}',
+                'email': f'user{number}@yamdb.fake',
+            })
+            assert response.status_code == HTTPStatus.OK
+        response = client.post(self.URL_SIGNUP, data={
+            'username': 'user2', 'email': 'user2@yamdb.fake'
+        })
+        self.check_throttled(response, self.URL_SIGNUP)
+        assert self.get_token(client, 'user0').status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), (
+            'Проверьте, что лимиты регистрации и выдачи токенов '
+            'независимы.'
+        )
+
+    def test_03_bucket_refills(self, client, user, limits):
+        limits['username'] = (1, 0.2)
+        self.get_token(client, user.username)
+        self.check_throttled(
+            self.get_token(client, user.username), self.URL_TOKEN)
+        time.sleep(0.25)
+        assert self.get_token(client, user.username).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), (
+            'Проверьте, что корзина пополняется со временем.'
+        )
+
+    def test_04_shared_cache(self, client, user, limits, settings):
+        settings.AUTH_RATE_LIMIT_CACHE_ALIAS = 'default'
+        for _ in range(2):
+            self.get_token(client, user.username)
+        buckets.clear()
+        self.check_throttled(
+            self.get_token(client, user.username), self.URL_TOKEN)
+
+    @pytest.mark.parametrize('url', (URL_SIGNUP, URL_TOKEN))
+    def test_05_non_dict_body(self, limits, url):
+        limits['ip'] = (1, 60)
+        client = APIClient()
+        response = client.post(url, data=[{'a': 1}], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что POST-запрос к `{url}` с телом не в виде '
+            'словаря возвращает ответ со статусом 400.'
+        )
+        self.check_throttled(
+            client.post(url, data=[{'a': 1}], format='json'), url)
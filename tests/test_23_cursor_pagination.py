@@ -0,0 +1,117 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.pagination import ReviewCommentPagination, TitlePagination
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def walk(self, client, url):
+        ids = []
+        url = f'{url}?cursor='
+        with CaptureQueriesContext(connection) as context:
+            while url:
+                response = client.get(url)
+                assert response.status_code == HTTPStatus.OK, (
+                    f'Проверьте, что GET-запрос к `{url}` возвращает ответ '
+                    'со статусом 200.'
+                )
+                data = response.json()
+                assert 'count' not in data, (
+                    'Проверьте, что в курсорном режиме ответ не содержит '
+                    'поле `count`.'
+                )
+                ids.extend(item['id'] for item in data['results'])
+                url = data['next']
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), (
+            'Проверьте, что курсорный режим не выполняет COUNT(*).'
+        )
+        return ids
+
+    @pytest.fixture
+    def discussion(self, admin, django_user_model):
+        title = Title.objects.create(name='Произведение', year=2000)
+        authors = [
+            django_user_model.objects.create(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake')
+            for idx in range(12)
+        ]
+        reviews = [
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=5)
+            for author in authors
+        ]
+        comments = [
+            Comment.objects.create(
+                review=reviews[0], author=admin, text=f'Комментарий {idx}')
+            for idx in range(12)
+        ]
+        return title, reviews, comments
+
+    def test_01_titles_cursor(self, client):
+        titles = [
+            Title.objects.create(name=f'Произведение {idx % 7}', year=2000)
+            for idx in range(23)
+        ]
+        ids = self.walk(client, self.TITLES_URL)
+        assert ids == [
+            title.pk for title in sorted(
+                titles, key=lambda title: (title.name, title.pk))
+        ], (
+            f'Проверьте, что курсорный обход `{self.TITLES_URL}` возвращает '
+            'каждое произведение ровно один раз в порядке сортировки.'
+        )
+
+    def test_02_reviews_and_comments_cursor(self, client, discussion):
+        title, reviews, comments = discussion
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.pk)
+        assert self.walk(client, url) == [review.pk for review in reviews], (
+            f'Проверьте, что курсорный обход `{url}` возвращает каждый '
+            'отзыв ровно один раз.'
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.pk, review_id=reviews[0].pk)
+        assert self.walk(client, url) == [
+            comment.pk for comment in comments
+        ], (
+            f'Проверьте, что курсорный обход `{url}` возвращает каждый '
+            'комментарий ровно один раз.'
+        )
+
+    def test_03_default_pagination_unchanged(self, client, discussion):
+        title, reviews, _ = discussion
+        data = client.get(self.TITLES_URL).json()
+        assert data['count'] == 1 and 'next' in data, (
+            f'Проверьте, что без параметра `cursor` `{self.TITLES_URL}` '
+            'использует постраничную пагинацию.'
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.pk)
+        data = client.get(f'{url}?limit=5&offset=10').json()
+        assert data['count'] == len(reviews) and len(data['results']) == 2, (
+            f'Проверьте, что без параметра `cursor` `{url}` поддерживает '
+            '`limit` и `offset`.'
+        )
+
+    def test_04_attributes_delegated(self):
+        paginator = TitlePagination()
+        assert paginator.page_query_param == 'page'
+        assert paginator.page_size == 10
+        assert ReviewCommentPagination().limit_query_param == 'limit'
+        assert not hasattr(TitlePagination.__new__(TitlePagination),
+                           'page_size'), (
+            'Проверьте, что пагинатор без вложенного пагинатора не уходит '
+            'в бесконечную рекурсию.'
+        )
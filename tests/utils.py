@@ -1,5 +1,8 @@
 from http import HTTPStatus
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 check_name_and_slug_patterns = (
     (
         {
@@ -101,6 +104,27 @@ invalid_data_for_user_patch_and_creation.extend([
 ])
 
 
+def get_queries(client, url, expected_status=HTTPStatus.OK):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == expected_status, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        f'{expected_status}.'
+    )
+    return context.captured_queries
+
+
+def count_queries(client, url, expected_status=HTTPStatus.OK):
+    return len(get_queries(client, url, expected_status))
+
+
+def count_user_queries(client, url, expected_status=HTTPStatus.OK):
+    return sum(
+        '"users_user"' in query['sql']
+        for query in get_queries(client, url, expected_status)
+    )
+
+
 def check_pagination(url, respons_data, expected_count, post_data=None):
     expected_keys = ('count', 'next', 'previous', 'results')
     for key in expected_keys: